@@ -1,7 +1,7 @@
 """
 File: bot.py
 Maintainer: Vintage Warhawk
-Last Edit: 2025-12-2
+Last Edit: 2026-10-17
 
 Description:
 This is the main entry point for the Discord bot framework. It sets up the Discord client,
@@ -19,7 +19,10 @@ import pytz
 from schedules import manager as schedule_manager # ScheduleManager instance managing registered schedules
 from tasks import manager as task_manager  # TaskManager instance managing registered tasks
 from commands import manager as command_manager  # CommandManager instance handling command hooks
+from library.command_manager import dispatch_key
 from commands import response as response_manager # ResponseManager instance handling response hooks
+from library import config_manager
+from library.fetch_cache import FetchCache
 
 # Set the timezone for scheduled tasks
 TIMEZONE = pytz.timezone("America/Chicago")
@@ -45,20 +48,31 @@ class MyClient(discord.Client):
 		super().__init__(**kwargs)
 		self.running_tasks = []  # store created tasks for later cancellation
 
+		# REST fetch caches, shared by all event handlers
+		self.message_cache = FetchCache(max_size=1000, ttl=60)	# message_id -> Message
+		self.member_cache = FetchCache(max_size=5000, ttl=300)	# (guild_id, user_id) -> Member
+
 	async def on_ready(self):
 		"""
 		Called when the bot is fully connected and ready.
 		Starts scheduled task loops.
 		"""
 		print(f"Logged in as \033[32m{self.user}\033[0m")
-		self.start_scheduled_tasks()
 
-		for name, task in task_manager.get_tasks("on_ready").items():
-			asyncio.create_task(task.run(self))
+		# on_ready fires again after a reconnect; the loops keep running
+		if not self.running_tasks:
+			self.start_scheduled_tasks()
+
+		task_manager.run_tasks("on_ready", self)
+
+	async def on_guild_join(self, guild):
+		schedule_manager.add_guild(guild.id)
+
+	async def on_guild_remove(self, guild):
+		schedule_manager.remove_guild(guild.id)
 
 	async def on_member_join(self, member):
-		for name, task in task_manager.get_tasks("on_join").items():
-			asyncio.create_task(task.run(self, member))
+		task_manager.run_tasks("on_join", self, member, target=member)
 
 	async def on_message(self, message):
 		"""
@@ -70,21 +84,20 @@ class MyClient(discord.Client):
 			return
 
 		# Check message waiters
-		for entry in list(response_manager.awaiting_messages):
-			if entry["channel_id"] != message.channel.id:
-				continue
-			if entry["user_id"] not in (0, message.author.id):
-				continue
-
-			# Trigger callback
-			await response_manager.handle_message(self, message, entry["command"])
-			response_manager.awaiting_messages.remove(entry)
+		entry = response_manager.match_message(message)
+		if entry is not None:
+			if entry.future is not None:
+				# Resume the waiting wait_for_message() call
+				entry.future.set_result(message)
+			else:
+				# Trigger callback, in order with the guild's commands
+				command_manager.dispatcher.submit(dispatch_key(message), response_manager.handle_message, self, message, entry.command)
 			return  # Only one waiter per message
 
-		await command_manager.handle_message(self, message)
+		# Commands run in order per guild and in parallel across guilds
+		command_manager.dispatch(self, message)
 
-		for name, task in task_manager.get_tasks("on_message").items():
-			asyncio.create_task(task.run(self, message))
+		task_manager.run_tasks("on_message", self, message, target=message)
 
 	async def on_reaction_add(self, reaction, user):
 		"""
@@ -94,121 +107,203 @@ class MyClient(discord.Client):
 		if user.bot:
 			return
 
-		 # Check message waiters
-		for entry in list(response_manager.awaiting_reactions):
-			if entry["message_id"] != reaction.message.id:
-				continue
-			if entry["user_id"] not in (0, user.id):
-				continue
-
-			# Trigger callback
-			await response_manager.handle_reaction(self, message, reaction.emoji, user, entry["command"])
-			response_manager.awaiting_reactions.remove(entry)
+		message = reaction.message
+
+		# Check reaction waiters
+		entry = response_manager.match_reaction(reaction, user)
+		if entry is not None:
+			if entry.future is not None:
+				# Resume the waiting wait_for_reaction() call
+				entry.future.set_result((reaction, user))
+			else:
+				# Trigger callback
+				await response_manager.handle_reaction(self, message, reaction.emoji, user, entry.command)
 			return # Only one waiter per message
 
-		for name, task in task_manager.get_tasks("on_reaction_add").items():
-			asyncio.create_task(task.run(self, message))
+		task_manager.run_tasks("on_reaction_add", self, message, target=message)
+
+	def get_message(self, channel_id, message_id, guild_id=None):
+		"""
+		Returns a message without a REST call: the cached message if the client
+		has it, otherwise a PartialMessage (id, channel and guild only).
+		guild_id keeps PartialMessage.guild set for channels that are not cached
+		(e.g. archived threads).
+		"""
+		message = discord.utils.get(self.cached_messages, id=message_id)
+		if message is not None:
+			return message
+
+		channel = self.get_channel(channel_id) or self.get_partial_messageable(channel_id, guild_id=guild_id)
+		return channel.get_partial_message(message_id)
+
+	async def fetch_full_message(self, message):
+		"""
+		Returns the full Message for a message from get_message(), fetching it
+		only if it is partial. Fetches go through message_cache, so concurrent
+		events for one message share a single REST call. Gateway events do not
+		update the fetched Message, so the raw reaction handlers drop it from
+		the cache once their tasks are submitted.
+		"""
+		if isinstance(message, discord.Message):
+			return message
+		return await self.message_cache.get(message.id, message.fetch)
+
+	async def fetch_member(self, guild, user_id):
+		"""
+		Returns a guild member from the gateway cache, or fetches it through
+		member_cache.
+		"""
+		member = guild.get_member(user_id)
+		if member is not None:
+			return member
+		return await self.member_cache.get((guild.id, user_id), lambda: guild.fetch_member(user_id))
+
+	async def on_raw_message_edit(self, payload):
+		self.message_cache.invalidate(payload.message_id)
+
+	async def on_raw_message_delete(self, payload):
+		self.message_cache.invalidate(payload.message_id)
+
+	async def on_raw_bulk_message_delete(self, payload):
+		for message_id in payload.message_ids:
+			self.message_cache.invalidate(message_id)
+
+	async def on_raw_reaction_clear(self, payload):
+		self.message_cache.invalidate(payload.message_id)
+
+	async def on_raw_reaction_clear_emoji(self, payload):
+		self.message_cache.invalidate(payload.message_id)
+
+	async def on_member_update(self, before, after):
+		self.member_cache.invalidate((after.guild.id, after.id))
+
+	async def on_raw_member_remove(self, payload):
+		self.member_cache.invalidate((payload.guild_id, payload.user.id))
 
 	async def on_raw_reaction_add(self, payload):
 		"""
 		Called when a new reaction is added on any message.
 		Ignores other bots. Checks for waiting responses.
+		Reactions on messages nobody listens to are dropped before any REST call.
 		"""
 
-		message = await self.get_channel(payload.channel_id).fetch_message(payload.message_id)
-
 		user = payload.member
 
-		if user.bot:
+		if user is None or user.bot:
+			return
+
+		entry = response_manager.match_static_reaction(payload.message_id, payload.user_id)
+		tasks = task_manager.wants("on_raw_reaction_add", payload.guild_id, payload.channel_id)
+		if entry is None and not tasks:
 			return
 
-		for entry in list(response_manager.static_reactions):
-			if entry["message_id"] != message.id:
-				continue
-			if entry["user_id"] not in (0, message.author.id):
-				continue
+		message = self.get_message(payload.channel_id, payload.message_id, payload.guild_id)
 
-			# Trigger callback
-			await response_manager.handle_reaction(self, message, payload.emoji, user, entry["command"])
+		if entry is not None:
+			# Trigger callback; handlers get the partial message unless they ask for the full one
+			if response_manager.needs_full_message(entry.command):
+				message = await self.fetch_full_message(message)
+				self.message_cache.invalidate(payload.message_id)
+			await response_manager.handle_reaction(self, message, payload.emoji, user, entry.command)
 			return # Only one waiter per message
 
-		for name, task in task_manager.get_tasks("on_raw_reaction_add").items():
-			asyncio.create_task(task.run(self, message))
+		message = await self.fetch_full_message(message)
+		task_manager.run_tasks("on_raw_reaction_add", self, message, target=message)
+		# The fetched reaction counts are now out of date; events arriving while the
+		# fetch was in flight still share it, later ones fetch again.
+		self.message_cache.invalidate(payload.message_id)
 
 	async def on_raw_reaction_remove(self, payload):
 		"""
 		Called when a reaction is removed on any message.
 		Ignores other bots. Checks for waiting responses.
+		Reactions on messages nobody listens to are dropped before any REST call.
 		"""
 
-		message = await self.get_channel(payload.channel_id).fetch_message(payload.message_id)
+		guild = self.get_guild(payload.guild_id) if payload.guild_id else None
 
-		user = message.guild.get_member(payload.user_id)
+		if guild is None:
+			return
+
+		entry = response_manager.match_static_reaction(payload.message_id, payload.user_id)
+		tasks = task_manager.wants("on_raw_reaction_remove", payload.guild_id, payload.channel_id)
+		if entry is None and not tasks:
+			return
 
-		if user is None:
-			user = await message.guild.fetch_member(payload.user_id)
+		user = await self.fetch_member(guild, payload.user_id)
 
 		if user.bot:
 			return
 
-		for entry in list(response_manager.static_reactions):
-			if entry["message_id"] != message.id:
-				continue
-			if entry["user_id"] not in (0, message.author.id):
-				continue
+		message = self.get_message(payload.channel_id, payload.message_id, payload.guild_id)
 
-			# Trigger callback
-			await response_manager.handle_reaction_remove(self, message, payload.emoji, user, entry["command"])
+		if entry is not None:
+			# Trigger callback; handlers get the partial message unless they ask for the full one
+			if response_manager.needs_full_message(entry.command):
+				message = await self.fetch_full_message(message)
+				self.message_cache.invalidate(payload.message_id)
+			await response_manager.handle_reaction_remove(self, message, payload.emoji, user, entry.command)
 			return # Only one waiter per message
 
-		for name, task in task_manager.get_tasks("on_raw_reaction_remove").items():
-			asyncio.create_task(task.run(self, message))
+		message = await self.fetch_full_message(message)
+		task_manager.run_tasks("on_raw_reaction_remove", self, message, target=message)
+		# The fetched reaction counts are now out of date; events arriving while the
+		# fetch was in flight still share it, later ones fetch again.
+		self.message_cache.invalidate(payload.message_id)
 
 	def start_scheduled_tasks(self):
 		"""
-		Starts asynchronous loops for schedules.
-		Each loop waits until its next scheduled run time before executing tasks.
+		Starts the scheduler, which runs the tasks of each schedule when it
+		comes due, and the response timeout loop.
 		"""
 
-		async def schedule_loop(interval_name, schedule):
+		def fire_schedule(interval_name, guild_id):
+			if guild_id is None:
+				for name, task in task_manager.get_tasks(interval_name).items():
+					print(f"\033[33m[Task]\033[36m [{interval_name}]\033[0m Running task: {name}")
+					task_manager.submit(interval_name, name, task, self)
+				return
+
+			# Guild schedule: one run per guild, in the guild's timezone
+			guild = self.get_guild(guild_id)
+			if guild is None:
+				return
+			for name, task in task_manager.get_tasks(interval_name).items():
+				task_manager.submit(interval_name, name, task, self, guild, key=guild_id)
+
+		async def schedule_loop():
 			try:
-				while True:
-					await asyncio.sleep(1) # Buffer to prevent double hook calls.
-					seconds = await schedule.get(self)
-					await asyncio.sleep(seconds)
-					for name, task in task_manager.get_tasks(interval_name).items():
-						print(f"\033[33m[Task]\033[36m [{interval_name}]\033[0m Running task: {name}")
-						asyncio.create_task(task.run(self))
+				await schedule_manager.run(self, fire_schedule)
 			except asyncio.CancelledError:
 				return
 
-		for name, schedule in schedule_manager.schedules.items():
-			self.running_tasks.append(asyncio.create_task(schedule_loop( name, schedule )))
+		self.running_tasks.append(asyncio.create_task(schedule_loop()))
 
 
-		# Loop to clean up responses that have hit their timeout limit. (15 second accuracy)
+		# Loop to clean up responses as they hit their timeout limit.
 		async def response_cleanup():
 			try:
-				while True:
-					await asyncio.sleep(15)
-					response_manager.check_timeouts(self)
-					
+				await response_manager.run_timeouts(self)
+
 			except asyncio.CancelledError:
 				# Cleanup pending response requests, and send time out message
 
+				# Wake wait_for_message()/wait_for_reaction() callers with CancelledError.
+				response_manager.cancel_waiters()
+
 				# Time out all pending message responses.
-				for entry in response_manager.awaiting_messages:
-					channel = self.get_channel(entry["channel_id"])
+				for entry in response_manager.iter_awaiting_messages():
+					channel = self.get_channel(entry.channel_id)
 					if channel:
-						print(f"[--- ] \033[31m[Shutdown]\033[36m [Response]\033[0m {entry["timeout_message"]}")
-						await channel.send(entry["timeout_message"])
+						print(f"[--- ] \033[31m[Shutdown]\033[36m [Response]\033[0m {entry.timeout_message}")
+						await channel.send(entry.timeout_message)
 
 				# Time out all pending reaction responses.
-				for entry in response_manager.awaiting_reactions:
-					channel = self.get_channel(entry["channel_id"])
+				for entry in response_manager.iter_awaiting_reactions():
+					channel = self.get_channel(entry.channel_id)
 					if channel:
-						print(f"[--- ] \033[31m[Shutdown]\033[36m [Response]\033[0m {entry["timeout_message"]}")
-						await channel.send(entry["timeout_message"])
+						print(f"[--- ] \033[31m[Shutdown]\033[36m [Response]\033[0m {entry.timeout_message}")
+						await channel.send(entry.timeout_message)
 
 				return
 
@@ -241,8 +336,28 @@ class MyClient(discord.Client):
 			except Exception as e:
 				print(f"[{'-' * i}{' ' * (task_count - i)}] Task raised exception \033[31m{e}\033[0m")  # Log but continue
 
+		# let queued commands finish
+		finished = await command_manager.dispatcher.drain(timeout=10)
+		stats = command_manager.dispatcher.stats()
+		print(f"Commands drained{'' if finished else ' (timed out)'}: {stats['processed']} processed, {stats['failures']} failed, queue high water {stats['high_water']}, avg wait {stats['avg_wait'] * 1000:.1f} ms.")
+
+		# let running event/scheduled task runs finish, cancel stragglers
+		finished, cancelled = await task_manager.drain(timeout=10)
+		print(f"Task runs drained: {finished} finished, {cancelled} cancelled.")
+
+		for name, stats in task_manager.get_stats().items():
+			print(f"  {name}: {stats['runs']} runs, {stats['failures']} failed, {stats['timeouts']} timed out, {stats['overruns']} overruns, "
+				  f"p50 {stats['p50_time'] * 1000:.1f} ms, p99 {stats['p99_time'] * 1000:.1f} ms, max {stats['max_time'] * 1000:.1f} ms")
+
 		print("All tasks stopped.")
 
+		# write any deferred config changes before exiting
+		await config_manager.flush()
+
+		for name, cache in (("Message", self.message_cache), ("Member", self.member_cache)):
+			stats = cache.stats()
+			print(f"{name} cache: {stats['hit_rate']:.0%} hit rate ({stats['hits']} hits, {stats['shared']} shared, {stats['misses']} fetches)")
+
 		# close discord connection
 		print("\033[31mPyBot shutdown complete.\033[0m")
 		await self.close()
@@ -259,6 +374,27 @@ async def main():
 	loop = asyncio.get_running_loop()
 	client = MyClient(intents=intents)
 
+	# Guilds whose commands are processed in parallel
+	if os.getenv("PYBOT_COMMAND_WORKERS"):
+		command_manager.dispatcher.workers = int(os.getenv("PYBOT_COMMAND_WORKERS"))
+
+	# Concurrent runs allowed per task event/interval
+	if os.getenv("PYBOT_TASK_CONCURRENCY"):
+		task_manager.set_limit(int(os.getenv("PYBOT_TASK_CONCURRENCY")))
+
+	# Pool sizes for tasks registered with executor="thread" / "process"
+	if os.getenv("PYBOT_TASK_THREADS"):
+		task_manager.set_executor_size("thread", int(os.getenv("PYBOT_TASK_THREADS")))
+	if os.getenv("PYBOT_TASK_PROCESSES"):
+		task_manager.set_executor_size("process", int(os.getenv("PYBOT_TASK_PROCESSES")))
+
+	# Opt-in deferred config writes (see readme: Data System / Config)
+	if os.getenv("PYBOT_CONFIG_WRITE_BEHIND"):
+		config_manager.enable_write_behind(
+			debounce=float(os.getenv("PYBOT_CONFIG_FLUSH_DELAY", "2")),
+			max_dirty=int(os.getenv("PYBOT_CONFIG_FLUSH_THRESHOLD", "50")),
+		)
+
 	stop_event = asyncio.Event()
 
 	# signal handler
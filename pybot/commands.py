@@ -1,7 +1,7 @@
 """
 File: commands.py
 Maintainer: Vintage Warhawk
-Last Edit: 2025-11-30
+Last Edit: 2026-10-16
 
 Description:
 This file contains all custom command classes for the Discord bot framework.
@@ -17,8 +17,11 @@ import discord
 from discord import ui
 
 from library.command_manager import CommandManager
-from library.config_manager import SetConfig
-from library.config_manager import GetConfig
+from library.config_manager import aset_config
+from library.config_manager import aget_config
+from library.config_manager import aappend_config
+from library.config_manager import aremove_config
+from library.config_manager import subscribe
 from library.response_manager import ResponseManager
 from library.emoji_converter import EmojiConverter
 
@@ -77,7 +80,7 @@ class DefaultRoleCommand:
 			return
 
 		# Store the channel ID for this guild in the config system
-		SetConfig("default_role", role_name, guild_id=message.guild.id)
+		await aset_config("default_role", role_name, guild_id=message.guild.id)
 		print(f"\033[33m[Config]\033[0m new default role set: \033[33m{role_name} ({message.channel.id})\033[0m")
 		await message.channel.send(f"{role_name} is now the default role when joining!")
 
@@ -103,7 +106,7 @@ class HomeCommand:
 			return
 
 		# Store the channel ID for this guild in the config system
-		SetConfig("home_channels", str(message.channel.id), guild_id=message.guild.id)
+		await aset_config("home_channels", str(message.channel.id), guild_id=message.guild.id)
 		print(f"\033[33m[Config]\033[0m new home directory set: \033[33m{message.channel.name} \033[34m({message.channel.id})\033[0m")
 		await message.channel.send("This channel is now set as the home channel for this server!")
 
@@ -120,7 +123,7 @@ class AccouncementCommand:
 			await message.channel.send("Only admins can use !announcement.")
 			return
 
-		home_channel_id = GetConfig("home_channels", guild_id=message.guild.id).value()
+		home_channel_id = await aget_config("home_channels", guild_id=message.guild.id)
 
 		attachments = []
 
@@ -152,7 +155,7 @@ class EmbedCommand:
 			await message.channel.send("Only admins can use !embed.")
 			return
 
-		home_channel_id = GetConfig("home_channels", guild_id=message.guild.id).value()
+		home_channel_id = await aget_config("home_channels", guild_id=message.guild.id)
 
 		if home_channel_id:
 			channel = message.guild.get_channel(int(home_channel_id))
@@ -185,7 +188,7 @@ class AdminTicketButton(ui.View):
 
 	@ui.button(label="Close", style=discord.ButtonStyle.danger, custom_id="ticket-close")
 	async def open(self, interaction: discord.Interaction, button):
-		guild_tickets = GetConfig("tickets", guild_id=interaction.guild.id).value() or []
+		guild_tickets = await aget_config("tickets", guild_id=interaction.guild.id) or []
 
 		for entry in list(guild_tickets):
 			if entry["channel_id"] != interaction.channel.id:
@@ -202,8 +205,8 @@ class AdminTicketButton(ui.View):
 	
 			await interaction.channel.delete(reason=f"{entry["ticket_id"]} closed.")
 
-			guild_tickets.remove(entry)
-			SetConfig("tickets", guild_tickets, guild_id=guild.id)
+			ticket_id = entry["ticket_id"]
+			await aremove_config("tickets", lambda t: t["ticket_id"] == ticket_id, guild_id=guild.id)
 			print(f"\033[33m[Ticket]\033[0m Ticket Closed by \033[33m{interaction.user.name} \033[34m({entry["ticket_id"]})\033[0m")
 
 
@@ -268,9 +271,7 @@ class TicketModal(ui.Modal, title="Ticket Submission"):
 
 		ticket = {"user_id": user.id, "ticket_id": ticket_id, "channel_id": channel.id}
 
-		guild_tickets = GetConfig("tickets", guild_id=guild.id).value() or []
-		guild_tickets.append(ticket)
-		SetConfig("tickets", guild_tickets, guild_id=guild.id)
+		await aappend_config("tickets", ticket, guild_id=guild.id)
 
 		await interaction.response.send_message("Ticket Submitted.", ephemeral=True)
 
@@ -293,7 +294,7 @@ class TicketTask:
 		client.add_view(AdminTicketButton())
 		print("\033[33m[Ticket]\033[0m Registered Ticket Buttons.")
 
-task_manager.register_task("on_ready", "Ticket Submit", TicketTask())
+task_manager.register_task("on_ready", "Ticket Submit", TicketTask(), overlap="skip")
 
 # TicketHome Command
 class TicketHomeCommand:
@@ -312,7 +313,7 @@ class TicketHomeCommand:
 			return
 
 		# Store the channel ID for this guild in the config system
-		SetConfig("ticket_channels", str(message.channel.id), guild_id=message.guild.id)
+		await aset_config("ticket_channels", str(message.channel.id), guild_id=message.guild.id)
 		print(f"\033[33m[Config]\033[0m new ticket directory set: \033[33m{message.channel.name} \033[34m({message.channel.id})\033[0m")
 		await message.channel.send("This channel is now set as the ticket channel for this server!")
 
@@ -329,6 +330,37 @@ manager.register_command("!tickethome", TicketHomeCommand(), "| Sets the current
 # -----------------------------
 class AutoRoleCommand:
 
+	def __init__(self):
+		# guild_id -> {message_id: {emoji: role_name}}, built from config on first use
+		# and dropped whenever the guild's autorole config is written.
+		self.roles_by_message = {}
+		self.generation = 0
+		subscribe("autorole", self.on_config_change)
+
+	def on_config_change(self, key, guild_id, value):
+		"""
+		Drops the cached autorole map of a guild when its config changes.
+		"""
+		self.generation += 1
+		self.roles_by_message.pop(guild_id, None)
+
+	async def get_roles(self, guild_id, message_id):
+		"""
+		Returns {emoji: role_name} for an autorole message, or None if the
+		message is not an autorole message.
+		"""
+		guild_id = str(guild_id)
+		index = self.roles_by_message.get(guild_id)
+		if index is None:
+			generation = self.generation
+			entries = await aget_config("autorole", guild_id=guild_id) or []
+			index = {entry["message_id"]: {emoji: role for emoji, role in entry["roles"]} for entry in entries}
+
+			# Only cache if no write happened while the config was being read.
+			if generation == self.generation:
+				self.roles_by_message[guild_id] = index
+		return index.get(message_id)
+
 	async def run(self, client, message, args):
 		"""
 		Triggered when a user runs !autorole.
@@ -453,7 +485,7 @@ class AutoRoleCommand:
 				# Set a long-term reaction listener for this message
 				# The timeout is extremely long to keep the message "permanent"
 				timeout_at = datetime.datetime.utcnow() + datetime.timedelta(days=36500)
-				response.static_reaction(
+				await response.static_reaction(
 					message_id=sent.id,
 					guild_id=sent.guild.id,
 					channel_id=sent.channel.id,
@@ -465,9 +497,7 @@ class AutoRoleCommand:
 
 				# Save the autorole setup in config for persistence across restarts
 				autorole = {"message_id": sent.id, "roles": roles}
-				guild_autoroles = GetConfig("autorole", guild_id=sent.guild.id).value() or []
-				guild_autoroles.append(autorole)
-				SetConfig("autorole", guild_autoroles, guild_id=sent.guild.id)
+				await aappend_config("autorole", autorole, guild_id=sent.guild.id)
 
 				try:
 					await self.sender_message.delete()
@@ -508,52 +538,44 @@ class AutoRoleCommand:
 		Adds the corresponding role to the user.
 		"""
 
-		guild_autoroles = GetConfig("autorole", guild_id=message.guild.id).value()
-
-		for entry in list(guild_autoroles):
-			if entry["message_id"] != message.id:
-				continue
-
-			# Map emojis to role names for this message
-			roles = {emoji: role for emoji, role in entry["roles"]}
+		# Map emojis to role names for this message
+		roles = await self.get_roles(message.guild.id, message.id)
+		if roles is None:
+			return
 
-			role_name = roles.get(str(reaction))
-			if role_name is None:
-				print(f"\033[33m[Autorole]\033[0m {reaction} has no role.\033[0m")
-				return
+		role_name = roles.get(str(reaction))
+		if role_name is None:
+			print(f"\033[33m[Autorole]\033[0m {reaction} has no role.\033[0m")
+			return
 
-			role = discord.utils.get(message.guild.roles, name=role_name)
-			if role:
-				await user.add_roles(role)
-				# Print colored console log for debugging
-				print(f"\033[33m[Autorole]\033[32m [{user.name}]\033[0m Added role: \033[33m{role_name} \033[34m({message.id}) \033[0m")
-			else:
-				print(f"\033[33m[Autorole]\033[0m {role_name} role doesn't exist.\033[0m")
+		role = discord.utils.get(message.guild.roles, name=role_name)
+		if role:
+			await user.add_roles(role)
+			# Print colored console log for debugging
+			print(f"\033[33m[Autorole]\033[32m [{user.name}]\033[0m Added role: \033[33m{role_name} \033[34m({message.id}) \033[0m")
+		else:
+			print(f"\033[33m[Autorole]\033[0m {role_name} role doesn't exist.\033[0m")
 
 	async def on_reaction_remove(self, client, message, reaction, user):
 		"""
 		Triggered when a user removes a reaction.
 		Removes the corresponding role from the user.
 		"""
-		guild_autoroles = GetConfig("autorole", guild_id=message.guild.id).value()
-
-		for entry in list(guild_autoroles):
-			if entry["message_id"] != message.id:
-				continue
-
-			roles = {emoji: role for emoji, role in entry["roles"]}
+		roles = await self.get_roles(message.guild.id, message.id)
+		if roles is None:
+			return
 
-			role_name = roles.get(str(reaction))
-			if role_name is None:
-				print(f"\033[33m[Autorole]\033[0m {reaction} has no role.\033[0m")
-				return
+		role_name = roles.get(str(reaction))
+		if role_name is None:
+			print(f"\033[33m[Autorole]\033[0m {reaction} has no role.\033[0m")
+			return
 
-			role = discord.utils.get(message.guild.roles, name=role_name)
-			if role:
-				await user.remove_roles(role)
-				print(f"\033[33m[Autorole]\033[32m [{user.name}]\033[0m Removed role: \033[33m{role_name} \033[34m({message.id}) \033[0m")
-			else:
-				print(f"\033[33m[Autorole]\033[0m {role_name} role doesn't exist.\033[0m")
+		role = discord.utils.get(message.guild.roles, name=role_name)
+		if role:
+			await user.remove_roles(role)
+			print(f"\033[33m[Autorole]\033[32m [{user.name}]\033[0m Removed role: \033[33m{role_name} \033[34m({message.id}) \033[0m")
+		else:
+			print(f"\033[33m[Autorole]\033[0m {role_name} role doesn't exist.\033[0m")
 
 
 # Register the !autorole command
@@ -662,7 +684,7 @@ class ReactCommand:
 
 		confirm = await message.channel.send("React to this message!")
 
-		response.static_reaction(
+		await response.static_reaction(
 			message_id=confirm.id,
 			guild_id=message.guild.id,
 			channel_id=message.channel.id,
@@ -7,14 +7,21 @@ Description:
 This file defines the CommandManager class, which manages command hooks for the Discord bot.
 It allows commands to be registered with triggers (like "!test") and handles incoming
 messages by dispatching them to the appropriate command class.
+
+dispatch() runs commands on a KeyedDispatcher: commands of one guild run in the order
+they were sent, while different guilds are handled in parallel.
 """
 
+from library.dispatcher import KeyedDispatcher
+
+
 class CommandManager:
 	"""
 	Manages command hooks.
 
 	Attributes:
 		hooks (dict): Maps command triggers (lowercase) to their handler classes.
+		dispatcher (KeyedDispatcher): Runs commands serialized per guild.
 	"""
 
 	def __init__(self):
@@ -23,6 +30,7 @@ class CommandManager:
 		"""
 		self.hooks = {}
 		self.helps = {}
+		self.dispatcher = KeyedDispatcher()
 
 	def register_command(self, trigger: str, handler, desc: str):
 		"""
@@ -39,28 +47,74 @@ class CommandManager:
 
 
 
-	async def handle_message(self, client, message):
+	def resolve(self, message):
 		"""
-		Handle incoming Discord messages and dispatch to the registered command if found.
+		Find the registered command for a message.
 
 		Args:
 			message (discord.Message): The message object from the Discord API.
 
+		Returns:
+			tuple | None: (handler, args), or None if the message is not a command.
+
 		Notes:
 			- The first word of the message is treated as the trigger.
 			- All message words (including the trigger) are passed as `args` to the handler.
 		"""
 		if not message.content:
-			return
+			return None
 
 		parts = message.content.strip().split()
 		if not parts:
-			return
+			return None
 
 		trigger = parts[0].lower()	# Command trigger, e.g., "!test"
 		args = parts				# Full message split into parts
 
-		if trigger in self.hooks:
-			handler = self.hooks[trigger]
-			print(f"\033[33m[Command]\033[32m [{message.author.name}]\033[0m Called command: \033[33m{args[0]}\033[0m")
-			await handler.run(client, message, args)
+		handler = self.hooks.get(trigger)
+		if handler is None:
+			return None
+		return handler, args
+
+	async def handle_message(self, client, message):
+		"""
+		Handle incoming Discord messages and dispatch to the registered command if found.
+		Runs the command inline; see dispatch() for the queued variant.
+
+		Args:
+			message (discord.Message): The message object from the Discord API.
+		"""
+		command = self.resolve(message)
+		if command is None:
+			return
+
+		handler, args = command
+		print(f"\033[33m[Command]\033[32m [{message.author.name}]\033[0m Called command: \033[33m{args[0]}\033[0m")
+		await handler.run(client, message, args)
+
+	def dispatch(self, client, message):
+		"""
+		Queue the command for a message on the dispatcher, keyed by guild
+		(or by channel for direct messages). Must be called from the event loop.
+
+		Returns:
+			bool: True if the message was a command.
+		"""
+		command = self.resolve(message)
+		if command is None:
+			return False
+
+		handler, args = command
+		print(f"\033[33m[Command]\033[32m [{message.author.name}]\033[0m Called command: \033[33m{args[0]}\033[0m")
+		self.dispatcher.submit(dispatch_key(message), handler.run, client, message, args)
+		return True
+
+
+def dispatch_key(message):
+	"""
+	Serialization key for work triggered by a message: its guild, or its
+	channel for direct messages.
+	"""
+	if message.guild is not None:
+		return message.guild.id
+	return ("dm", message.channel.id)
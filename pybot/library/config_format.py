@@ -0,0 +1,116 @@
+"""
+File: config_format.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+On-disk formats for config snapshots (data.json and the journal's compacted snapshot).
+
+	json     Pretty-printed JSON, as written by earlier versions. Human-readable, no header.
+	compact  Minified JSON behind a versioned header. About half the size of "json".
+	marshal  Python's marshal format behind a versioned header. Smallest and fastest
+	         to load, but only readable by Python. Only data JSON could store unchanged
+	         is written, so files convert between all formats.
+
+Compact files start with MAGIC followed by the header version, the codec id and the
+codec's own version. Valid JSON never starts with MAGIC, so loads() detects the format
+of any file and switching formats needs no migration step; the next write converts it.
+
+Select the format with PYBOT_CONFIG_FORMAT. A readable JSON copy of a compact file can
+be written with python -m library.config_migrate --export.
+"""
+
+import json
+import marshal
+
+MAGIC = b"PYBOTCFG"
+HEADER_VERSION = 1
+
+# codec name -> id stored in the header
+CODECS = {"compact": 1, "marshal": 2}
+FORMATS = ("json",) + tuple(CODECS)
+
+# Leaf types that read back from JSON as the same type
+JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def normalize(value):
+	"""
+	Returns a copy of a value as it reads back from a config file: tuples become
+	lists and dict keys become strings.
+
+	Raises:
+		TypeError: If the value holds something JSON cannot store, e.g. a set.
+	"""
+	return json.loads(json.dumps(value))
+
+def _check_json(data):
+	"""
+	Raises TypeError unless data is made of dicts with string keys, lists, strings,
+	numbers, booleans and None, i.e. reads back unchanged from JSON.
+	"""
+	stack = [data]
+	while stack:
+		value = stack.pop()
+		kind = type(value)
+		if kind is dict:
+			for key in value:
+				if type(key) is not str:
+					raise TypeError(f"Config keys must be strings, not {type(key).__name__}")
+			stack.extend(value.values())
+		elif kind is list:
+			stack.extend(value)
+		elif kind not in JSON_SCALARS:
+			raise TypeError(f"Config data can only hold JSON types, not {kind.__name__}")
+
+def dumps(data, fmt="json"):
+	"""
+	Serializes config data in the given format.
+
+	Args:
+		data (dict): Config data.
+		fmt (str): "json", "compact" or "marshal".
+
+	Returns:
+		bytes: Encoded file contents.
+	"""
+	if fmt == "json":
+		return json.dumps(data, indent=4).encode()
+	if fmt == "compact":
+		header = bytes((HEADER_VERSION, CODECS[fmt], 0))
+		return MAGIC + header + json.dumps(data, separators=(",", ":")).encode()
+	if fmt == "marshal":
+		# marshal also stores sets, tuples and int keys, which the other formats cannot.
+		_check_json(data)
+		header = bytes((HEADER_VERSION, CODECS[fmt], marshal.version))
+		return MAGIC + header + marshal.dumps(data)
+	raise ValueError(f"Unknown config format: {fmt!r}")
+
+def loads(raw):
+	"""
+	Parses file contents written by dumps() in any format.
+
+	Args:
+		raw (bytes): File contents.
+
+	Returns:
+		dict: Config data.
+	"""
+	if not raw.startswith(MAGIC):
+		return json.loads(raw)
+
+	header = raw[len(MAGIC):len(MAGIC) + 3]
+	if len(header) < 3:
+		raise ValueError("Truncated config header")
+	version, codec, codec_version = header
+	if version > HEADER_VERSION:
+		raise ValueError(f"Config file has header version {version}, newer than this bot supports")
+
+	body = memoryview(raw)[len(MAGIC) + 3:]
+	if codec == CODECS["compact"]:
+		return json.loads(bytes(body))
+	if codec == CODECS["marshal"]:
+		if codec_version > marshal.version:
+			raise ValueError(f"Config file uses marshal version {codec_version}, newer than this Python supports")
+		return marshal.loads(body)
+	raise ValueError(f"Unknown config codec id: {codec}")
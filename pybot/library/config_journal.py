@@ -0,0 +1,183 @@
+"""
+File: config_journal.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Journaled variant of the JSON config backend. Instead of rewriting data.json for
+every change, each change is appended as one compact record to data.json.journal,
+so a write costs the size of the change rather than the size of the database.
+
+On load the snapshot (data.json) is read and the journal is replayed on top of it.
+Once the journal grows past a size threshold it is compacted into a new snapshot
+on a background thread.
+
+Crash safety:
+	- A torn final record (a partial line left by a crash mid-append) is discarded
+	  and trimmed from the journal on load.
+	- Compaction first rotates the journal to data.json.journal.old. If the process
+	  dies before the new snapshot is in place, both journals are replayed.
+
+Several processes may share the files. Appends, replays and rotation happen under
+the backend's file lock, and only one process compacts at a time.
+
+Select it with PYBOT_CONFIG_BACKEND=journal (PYBOT_CONFIG_JOURNAL_LIMIT sets the
+compaction threshold in bytes). The snapshot honours PYBOT_CONFIG_FORMAT like the
+JSON backend; the journal itself is always one JSON record per line.
+"""
+
+import json
+import os
+import shutil
+import threading
+
+from library import config_format
+from library.config_manager import JsonBackend, _stat
+from library.file_lock import FileLock
+
+
+class JournalBackend(JsonBackend):
+	"""
+	JSON backend that appends changes to a journal instead of rewriting the file.
+
+	Journal records are one JSON object per line:
+		{"k": key, "g": guild_id or null, "v": value}
+	"""
+
+	def __init__(self, path=None, fmt="json", compact_at=1048576):
+		"""
+		Args:
+			path (str, optional): Snapshot file. Defaults to CONFIG_FILE.
+			fmt (str): Snapshot format, see config_format.py.
+			compact_at (int): Journal size in bytes that triggers compaction.
+		"""
+		super().__init__(path, fmt)
+		self.journal_path = self.path + ".journal"
+		self.old_path = self.journal_path + ".old"
+		self.compact_at = compact_at
+		self.compact_lock = FileLock(self.path + ".compact.lock")
+		self.compactor = None	# running compaction thread
+
+	def _stamp(self):
+		return (_stat(self.path), _stat(self.old_path), _stat(self.journal_path))
+
+	def _read(self):
+		data = super()._read()
+		self._replay(data, self.old_path)
+		self._replay(data, self.journal_path)
+		return data
+
+	def _replay(self, data, path):
+		"""
+		Applies every record of a journal to data in place.
+		A torn final record is trimmed from the file; other corrupt records are skipped.
+		Must be called while holding self.file_lock, so the tail being appended
+		by another process is never mistaken for a torn record.
+		"""
+		try:
+			with open(path, "rb") as f:
+				raw = f.read()
+		except FileNotFoundError:
+			return
+
+		offset = 0
+		for line in raw.splitlines(keepends=True):
+			try:
+				if not line.endswith(b"\n"):
+					raise ValueError("incomplete record")
+				record = json.loads(line)
+				key, guild_id, value = record["k"], record["g"], record["v"]
+			except (ValueError, KeyError, TypeError):
+				if offset + len(line) == len(raw):
+					print(f"\033[33m[Config]\033[31m Discarding torn journal record in {os.path.basename(path)}\033[0m")
+					with open(path, "r+b") as f:
+						f.truncate(offset)
+					return
+				print(f"\033[33m[Config]\033[31m Skipping corrupt journal record in {os.path.basename(path)}\033[0m")
+				offset += len(line)
+				continue
+
+			if guild_id:
+				if not isinstance(data.get(key), dict):
+					data[key] = {}
+				data[key][guild_id] = value
+			else:
+				data[key] = value
+			offset += len(line)
+
+	def _append(self, records, data):
+		"""
+		Appends records to the journal and starts a compaction of data, which
+		includes them, if the journal has grown past the threshold.
+		Must be called while holding self.lock and self.file_lock.
+		"""
+		lines = "".join(
+			json.dumps({"k": key, "g": guild_id, "v": value}, separators=(",", ":")) + "\n"
+			for key, guild_id, value in records
+		)
+		with open(self.journal_path, "a") as f:
+			f.write(lines)
+		self.stamp = self._stamp()
+
+		if self.compactor is None and self.stamp[2][1] >= self.compact_at:
+			self._start_compaction(data)
+
+	def _commit(self, data, key, value, guild_id):
+		self._append([(key, guild_id, value)], data)
+
+	def _commit_deferred(self, data, records):
+		self._append(records, data)
+
+	def _start_compaction(self, data):
+		"""
+		Rotates the journal and writes data as the new snapshot on a background
+		thread. Skipped while another process is compacting.
+		Must be called while holding self.lock and self.file_lock.
+		"""
+		if not self.compact_lock.acquire(blocking=False):
+			return
+
+		if os.path.exists(self.old_path):
+			# An earlier compaction did not finish; keep its records in order.
+			with open(self.journal_path, "rb") as src, open(self.old_path, "ab") as dst:
+				shutil.copyfileobj(src, dst)
+			os.remove(self.journal_path)
+		else:
+			os.replace(self.journal_path, self.old_path)
+		self.stamp = self._stamp()
+
+		# Published data is never modified in place, so it can be serialized unlocked.
+		self.compactor = threading.Thread(
+			target=self._compact, args=(data,),
+			name="pybot-config-compact", daemon=True
+		)
+		self.compactor.start()
+
+	def _compact(self, data):
+		"""
+		Writes a snapshot, then drops the rotated journal it covers.
+		"""
+		try:
+			tmp = self.path + ".compact.tmp"
+			with open(tmp, "wb") as f:
+				f.write(config_format.dumps(data, self.fmt))
+
+			with self.lock, self.file_lock:
+				os.replace(tmp, self.path)
+				os.remove(self.old_path)
+				# Keep the journal part of the stamp, so appends made by other
+				# processes during compaction still trigger a reload.
+				if self.stamp is not None:
+					self.stamp = (_stat(self.path), None, self.stamp[2])
+			print("\033[33m[Config]\033[0m Compacted config journal.")
+		except Exception as e:
+			print(f"\033[33m[Config]\033[31m Journal compaction failed: {e}\033[0m")
+		finally:
+			self.compactor = None
+			self.compact_lock.release()
+
+	def close(self):
+		super().close()
+		compactor = self.compactor
+		if compactor is not None:
+			compactor.join()
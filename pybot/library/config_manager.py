@@ -1,62 +1,542 @@
 """
 File: config.py
 Maintainer: Vintage Warhawk
-Last Edit: 2025-11-23
+Last Edit: 2026-10-17
 
 Description:
 This file provides a simple JSON-based configuration system for the Discord bot.
 It allows storing and retrieving persistent data per server (guild) or globally.
 Includes GetConfig and SetConfig classes for reading and writing configuration entries.
+
+Storage is pluggable. GetConfig and SetConfig talk to a ConfigBackend; the default
+JsonBackend keeps everything in data/data.json. PYBOT_CONFIG_BACKEND selects the
+journaled variant from config_journal.py ("journal"), one file per guild from
+config_sharded.py ("sharded") or the SQLite backend from config_sqlite.py ("sqlite").
+
+The JSON backend caches the parsed file process-wide. PYBOT_CONFIG_FORMAT can
+switch its file to a compact format from config_format.py for faster startup. SetConfig writes through the
+cache, and an mtime/size check picks up edits made to the file outside of this process.
+
+Optionally, writes can be deferred (write-behind): SetConfig only updates the
+backend in memory, and a background coroutine persists once per debounce window or
+once enough writes are pending. Call flush() before exiting.
+
+Coroutines should use the awaitable aget_config/aget_config_all/aset_config
+functions, which run reads, writes and serialization on a dedicated I/O thread
+so the event loop is never blocked by the disk. The classes remain for scripts.
+
+Read-modify-write of a single value (for example appending to a per-guild list)
+should go through update_config/append_config/remove_config or their async
+counterparts, which apply the change under the backend's lock in one step so
+concurrent writers cannot lose each other's updates.
+
+subscribe(key, callback) registers a callback that runs on the event loop after
+every successful write of the key, so derived in-memory indexes can be dropped
+or rebuilt without polling the storage.
 """
 
-import json
+import asyncio
+import copy
+import functools
 import os
 
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
-_write_lock = Lock()
+
+from library import config_format
+from library.file_lock import FileLock
 
 
 # The JSON file that stores all persistent configuration data
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_FILE = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "data.json"))
+DATA_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "data"))
+CONFIG_FILE = os.path.join(DATA_DIR, "data.json")
 
-class Config:
+# Write-behind state. Disabled while loop is None.
+#   debounce:  seconds to wait after the first pending write before flushing
+#   max_dirty: number of pending writes that triggers an immediate flush
+#   dirty:     writes applied in memory but not yet persisted
+_write_behind = {
+	"loop": None,
+	"task": None,
+	"pending": None,
+	"full": None,
+	"debounce": 2.0,
+	"max_dirty": 50,
+	"dirty": 0,
+}
+
+# Active storage backend, created on first use (see get_backend()).
+_backend = None
+
+# Single I/O thread for the async API, created on first use. One worker keeps
+# config operations in submission order.
+_executor = None
+
+# Change subscriptions: key -> [callback(key, guild_id, value)]. Callbacks run on
+# _loop, the event loop that last used the async API or enabled write-behind.
+_subscribers = {}
+_loop = None
+
+# -----------------------------
+# Storage backends
+# -----------------------------
+class ConfigBackend:
 	"""
-	Base configuration class.
-	Handles reading from and writing to the JSON config file.
+	Interface for config storage backends.
+
+	Values are addressed by (key, guild_id), where guild_id is a string or None
+	for global values. read() and read_all() may return objects shared with the
+	backend; GetConfig copies them before handing them out.
+	"""
+
+	def read(self, key, guild_id):
+		"""
+		Returns the value for the key (and guild if provided), or None.
+		"""
+		raise NotImplementedError
+
+	def read_all(self, key):
+		"""
+		Returns a dict of all guild values for the key.
+		"""
+		raise NotImplementedError
+
+	def iter_all(self, key):
+		"""
+		Yields (guild_id, value) for all guild values of the key.
+		Backends that do not hold everything in memory override this to stream.
+		"""
+		yield from self.read_all(key).items()
+
+	def write(self, key, value, guild_id, defer=False):
+		"""
+		Stores the value for the key (and guild if provided).
+		With defer=True the change may be held in memory until persist().
+		"""
+		raise NotImplementedError
+
+	def update(self, key, fn, guild_id, defer=False):
+		"""
+		Atomically replaces the value for the key (and guild if provided) with
+		fn(current). fn receives a private copy of the current value, or None.
+		Returns the new value.
+		"""
+		raise NotImplementedError
+
+	def persist(self):
+		"""
+		Writes deferred changes to storage. Returns the number of changes written.
+		"""
+		return 0
+
+	def cache_stats(self):
+		"""
+		Returns the backend's cache hit/miss counters.
+		"""
+		return {"hits": 0, "misses": 0}
+
+	def invalidate(self):
+		"""
+		Drops any cached data so the next read goes to storage.
+		"""
+
+	def close(self):
+		"""
+		Persists deferred changes and releases resources.
+		"""
+		self.persist()
+
+
+def _stat(path):
+	"""
+	Returns (mtime_ns, size, inode) of a file, or None if it does not exist.
+	Files are replaced atomically on write, so the inode changes with every
+	rewrite even when the mtime resolution is coarse.
+	"""
+	try:
+		st = os.stat(path)
+	except FileNotFoundError:
+		return None
+	return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class JsonBackend(ConfigBackend):
 	"""
+	Stores all configuration in a single JSON document.
+
+	The parsed document is cached. Writes replace the cached dictionary instead
+	of modifying it, so values handed out by read() never change underneath the
+	caller.
+
+	Several processes may share the file. Writes are done as read-modify-write
+	under an exclusive lock on <file>.lock. The cache is reloaded only when the
+	file's stamp (mtime, size, inode) shows that another process wrote it.
+	Deferred changes are re-applied on top of the other process's data when
+	they are persisted.
 
-	def __init__(self):
+	The file is written in one of the config_format formats and read in
+	whichever format it has, so changing the format converts it on the next write.
+	"""
+
+	def __init__(self, path=None, fmt="json"):
 		"""
-		Initializes the config file if it does not exist.
+		Args:
+			path (str, optional): JSON file to use. Defaults to CONFIG_FILE.
+			fmt (str): Format written to the file: "json", "compact" or "marshal".
 		"""
-		if not os.path.exists(CONFIG_FILE):
-			with open(CONFIG_FILE, "w") as f:
-				json.dump({}, f)
+		if fmt not in config_format.FORMATS:
+			raise ValueError(f"Unknown config format: {fmt!r}")
+		self.path = path or CONFIG_FILE
+		self.fmt = fmt
+		self.lock = Lock()
+		self.file_lock = FileLock(self.path + ".lock")
+		self.data = None	# parsed dictionary
+		self.stamp = None	# _stat() of the file(s) self.data matches
+		self.records = []	# deferred (key, guild_id, value) not yet on disk
+		self.stats = {"hits": 0, "misses": 0}
+
+	def _stamp(self):
+		"""
+		Returns the stamp of the backing file(s), compared to detect outside writes.
+		"""
+		return _stat(self.path)
+
+	def _cached(self):
+		"""
+		Returns the cached data if it is still current, otherwise None.
+		While deferred changes are pending the cache is always used, since it
+		is newer than the file. Must be called while holding self.lock.
+		"""
+		if self.records or (self.data is not None and self.stamp == self._stamp()):
+			self.stats["hits"] += 1
+			return self.data
+		return None
 
 	def _load(self):
 		"""
-		Loads and returns the full configuration data as a dictionary.
+		Returns the full configuration data as a dictionary, parsing the file
+		again if it changed. Must be called while holding self.lock and self.file_lock.
+		"""
+		data = self._cached()
+		if data is not None:
+			return data
+
+		self.stats["misses"] += 1
+		self.data = self._read()
+		self.stamp = self._stamp()
+		return self.data
+
+	def _snapshot(self):
+		"""
+		Returns the full configuration data for reading. The file lock is only
+		taken when the cache is stale. Must be called while holding self.lock.
+		"""
+		data = self._cached()
+		if data is not None:
+			return data
+		with self.file_lock:
+			return self._load()
+
+	def _read(self):
+		"""
+		Parses and returns the config file, creating it if it does not exist.
+		Must be called while holding self.lock and self.file_lock.
+		"""
+		if not os.path.exists(self.path):
+			with open(self.path, "wb") as f:
+				f.write(config_format.dumps({}, self.fmt))
+
+		with open(self.path, "rb") as f:
+			return config_format.loads(f.read())
+
+	def _write_file(self, data):
+		"""
+		Writes the dictionary to the config file in self.fmt and records
+		its new stamp. Must be called while holding self.lock and self.file_lock.
+		"""
+		tmp = self.path + ".tmp"
+		with open(tmp, "wb") as f:
+			f.write(config_format.dumps(data, self.fmt))
+		os.replace(tmp, self.path)
+		self.stamp = self._stamp()
+
+	@staticmethod
+	def _get(data, key, guild_id):
+		"""
+		Returns the value for the key (and guild if provided) from data.
+		"""
+		if guild_id:
+			return data.get(key, {}).get(guild_id)
+		return data.get(key)
+
+	@staticmethod
+	def _apply(data, key, value, guild_id):
+		"""
+		Sets the value in data, copying the per-guild dict it touches.
 		"""
-		with open(CONFIG_FILE, "r") as f:
-			return json.load(f)
+		if guild_id:
+			guilds = data.get(key)
+			data[key] = dict(guilds) if isinstance(guilds, dict) else {}
+			data[key][guild_id] = value
+		else:
+			data[key] = value
+
+	def _modify(self, key, guild_id, fn, defer):
+		"""
+		Stores fn(data) as the new value in a copy of the data and publishes it.
+		Immediate changes are made under the file lock on fresh data and
+		persisted; deferred changes are recorded for persist().
+		Must be called while holding self.lock.
+		"""
+		if defer:
+			data = dict(self._snapshot())
+			value = fn(data)
+			self._apply(data, key, value, guild_id)
+			self.data = data
+			self.records.append((key, guild_id, value))
+			return value
+
+		with self.file_lock:
+			# Deferred changes would hide writes of other processes from _load().
+			self._persist_records()
+			data = dict(self._load())
+			value = fn(data)
+			self._apply(data, key, value, guild_id)
+			# Publish only once the change is on disk, so a failed write leaves
+			# the cache matching the file.
+			self._commit(data, key, value, guild_id)
+			self.data = data
+		return value
 
-	def _save(self, data):
+	def _commit(self, data, key, value, guild_id):
 		"""
-		Saves the provided dictionary to the config file with formatting.
+		Persists one change that has been applied to data, the next self.data.
+		Must be called while holding self.lock and self.file_lock.
 		"""
-		with _write_lock:
-			tmp = CONFIG_FILE + ".tmp"
-			with open(tmp, "w") as f:
-				json.dump(data, f, indent=4)
-			os.replace(tmp, CONFIG_FILE)
+		self._write_file(data)
+
+	def _commit_deferred(self, data, records):
+		"""
+		Persists deferred changes that have been applied to data, the next self.data.
+		Must be called while holding self.lock and self.file_lock.
+		"""
+		self._write_file(data)
+
+	def read(self, key, guild_id):
+		with self.lock:
+			data = self._snapshot()
+		return self._get(data, key, guild_id)
+
+	def read_all(self, key):
+		with self.lock:
+			data = self._snapshot()
+		value = data.get(key, {})
+		return value if isinstance(value, dict) else {}
+
+	def write(self, key, value, guild_id, defer=False):
+		with self.lock:
+			self._modify(key, guild_id, lambda data: value, defer)
+
+	def update(self, key, fn, guild_id, defer=False):
+		with self.lock:
+			return self._modify(key, guild_id, lambda data: fn(copy.deepcopy(self._get(data, key, guild_id))), defer)
+
+	def _persist_records(self):
+		"""
+		Writes the deferred changes, re-applied on top of the file if another
+		process wrote it. Must be called while holding self.lock and self.file_lock.
+
+		Returns:
+			int: Number of changes written.
+		"""
+		if not self.records:
+			return 0
+
+		records, data = self.records, self.data
+		if self.stamp != self._stamp():
+			# Another process wrote since our data was loaded; rebase onto its data.
+			data = self._read()
+			for key, guild_id, value in records:
+				self._apply(data, key, value, guild_id)
+		self._commit_deferred(data, records)
+		# Dropped only now, so changes whose write failed are retried.
+		self.data = data
+		self.records = []
+		return len(records)
+
+	def persist(self):
+		with self.lock:
+			if not self.records:
+				return 0
+			with self.file_lock:
+				return self._persist_records()
+
+	def export(self, path):
+		"""
+		Writes the current data, including deferred changes, to a
+		pretty-printed JSON file regardless of the configured format.
+
+		Args:
+			path (str): Target file.
+		"""
+		with self.lock:
+			data = self._snapshot()
+		with open(path, "wb") as f:
+			f.write(config_format.dumps(data, "json"))
+
+	def cache_stats(self):
+		return dict(self.stats)
+
+	def invalidate(self):
+		with self.lock:
+			if self.records:
+				return
+			self.data = None
+			self.stamp = None
+
+
+def _backend_from_env():
+	"""
+	Creates the storage backend selected by PYBOT_CONFIG_BACKEND
+	("json", "journal", "sharded" or "sqlite"). PYBOT_CONFIG_FORMAT selects the
+	file format of the json and journal backends ("json", "compact" or "marshal").
+	"""
+	name = os.getenv("PYBOT_CONFIG_BACKEND", "json").lower()
+	fmt = os.getenv("PYBOT_CONFIG_FORMAT", "json").lower()
+	if name == "sqlite":
+		from library.config_sqlite import SQLiteBackend
+		return SQLiteBackend(os.getenv("PYBOT_CONFIG_DB", os.path.join(DATA_DIR, "data.db")))
+	if name == "sharded":
+		from library.config_sharded import ShardedBackend
+		return ShardedBackend(DATA_DIR, max_guilds=int(os.getenv("PYBOT_CONFIG_SHARD_CACHE", "1000")))
+	if name == "journal":
+		from library.config_journal import JournalBackend
+		return JournalBackend(CONFIG_FILE, fmt=fmt, compact_at=int(os.getenv("PYBOT_CONFIG_JOURNAL_LIMIT", "1048576")))
+	return JsonBackend(CONFIG_FILE, fmt=fmt)
+
+def get_backend():
+	"""
+	Returns the active storage backend, creating the default one on first use.
+	"""
+	global _backend
+	if _backend is None:
+		_backend = _backend_from_env()
+	return _backend
+
+def set_backend(backend):
+	"""
+	Replaces the active storage backend.
+	The previous backend is closed, which persists its deferred changes.
+
+	Args:
+		backend (ConfigBackend): The backend to use from now on.
+	"""
+	global _backend
+	if _backend is not None and _backend is not backend:
+		_backend.close()
+	_backend = backend
+
+def cache_stats():
+	"""
+	Returns the cache hit/miss counters of the active backend.
+	Example return:
+		{ "hits": 120, "misses": 3 }
+	"""
+	return get_backend().cache_stats()
+
+def invalidate_cache():
+	"""
+	Drops the cached config so the next read goes back to storage.
+	"""
+	get_backend().invalidate()
+
+class Config:
+	"""
+	Base configuration class.
+	Routes reads and writes to the active storage backend.
+	"""
+
+	@property
+	def backend(self):
+		return get_backend()
+
+# -----------------------------
+# Write-behind persistence
+# -----------------------------
+def enable_write_behind(debounce=2.0, max_dirty=50):
+	"""
+	Defers config writes to a background flusher on the running event loop.
+	Must be called from within the event loop.
+
+	Args:
+		debounce (float): Seconds to collect writes before flushing.
+		max_dirty (int): Pending write count that triggers an early flush.
+	"""
+	if _write_behind["loop"] is not None:
+		return
+
+	_write_behind["debounce"] = debounce
+	_write_behind["max_dirty"] = max_dirty
+	_write_behind["pending"] = asyncio.Event()
+	_write_behind["full"] = asyncio.Event()
+	_write_behind["loop"] = asyncio.get_running_loop()
+	_write_behind["task"] = asyncio.create_task(_flush_loop())
+
+	global _loop
+	_loop = _write_behind["loop"]
+
+def _wake_flusher():
+	"""
+	Counts a deferred write and signals the flusher. Runs on the event loop.
+	"""
+	_write_behind["dirty"] += 1
+	_write_behind["pending"].set()
+	if _write_behind["dirty"] >= _write_behind["max_dirty"]:
+		_write_behind["full"].set()
+
+async def _flush_loop():
+	"""
+	Background coroutine that flushes pending writes once per debounce window,
+	or as soon as max_dirty writes are pending. A failed flush is logged and
+	retried after the next debounce window.
+	"""
+	try:
+		while True:
+			await _write_behind["pending"].wait()
+			try:
+				await asyncio.wait_for(_write_behind["full"].wait(), timeout=_write_behind["debounce"])
+			except asyncio.TimeoutError:
+				pass
+			try:
+				await flush()
+			except Exception as e:
+				print(f"\033[33m[Config]\033[31m Flushing pending writes failed, retrying: {e}\033[0m")
+				_write_behind["pending"].set()
+	except asyncio.CancelledError:
+		await flush()
+		raise
+
+async def flush():
+	"""
+	Persists all pending write-behind changes.
+	Does nothing if there are no pending changes.
+	"""
+	if _write_behind["pending"] is not None:
+		_write_behind["pending"].clear()
+		_write_behind["full"].clear()
+	_write_behind["dirty"] = 0
+
+	count = await _run_io(get_backend().persist)
+	if count:
+		print(f"\033[33m[Config]\033[0m Flushed {count} pending write(s).")
 
 # -----------------------------
 # Read configuration values
 # -----------------------------
 class GetConfig(Config):
 	"""
-	Retrieves configuration values from the JSON file.
+	Retrieves configuration values from the active backend.
 	Supports optional per-guild (server) scoping.
 	"""
 
@@ -66,18 +546,15 @@ class GetConfig(Config):
 			key (str): The configuration key to retrieve.
 			guild_id (str|int, optional): Guild ID for per-server values.
 		"""
-		super().__init__()
 		self.key = key
 		self.guild_id = str(guild_id) if guild_id else None
 
 	def value(self):
 		"""
 		Returns the stored value for the key (and guild if provided).
+		The value is a copy, so callers may modify it freely.
 		"""
-		data = self._load()
-		if self.guild_id:
-			return data.get(self.key, {}).get(self.guild_id)
-		return data.get(self.key)
+		return copy.deepcopy(self.backend.read(self.key, self.guild_id))
 
 	def all(self):
 		"""
@@ -85,16 +562,22 @@ class GetConfig(Config):
 		Example return:
 			{ "123": 1111111111, "456": 2222222222 }
 		"""
-		data = self._load()
-		value = data.get(self.key, {})
-		return value if isinstance(value, dict) else {}
+		return copy.deepcopy(self.backend.read_all(self.key))
+
+	def items(self):
+		"""
+		Yields (guild_id, value) for every guild value of the key.
+		Unlike all(), sharded backends stream this without loading every guild.
+		"""
+		for guild_id, value in self.backend.iter_all(self.key):
+			yield guild_id, copy.deepcopy(value)
 
 # -----------------------------
 # Write configuration values
 # -----------------------------
 class SetConfig(Config):
 	"""
-	Stores configuration values in the JSON file.
+	Stores configuration values in the active backend.
 	Supports optional per-guild (server) scoping.
 	"""
 
@@ -105,7 +588,6 @@ class SetConfig(Config):
 			value (any): The value to store.
 			guild_id (str|int, optional): Guild ID for per-server values.
 		"""
-		super().__init__()
 		self.key = key
 		self.value = value
 		self.guild_id = str(guild_id) if guild_id else None
@@ -113,13 +595,218 @@ class SetConfig(Config):
 
 	def save(self):
 		"""
-		Saves the value to the config file, either globally or per-guild.
+		Saves the value, either globally or per-guild.
+		The value is stored as it reads back from the file (see
+		config_format.normalize()), so reads before and after a restart agree,
+		and later changes by the caller are not stored.
 		"""
-		data = self._load()
-		if self.guild_id:
-			if self.key not in data:
-				data[self.key] = {}
-			data[self.key][self.guild_id] = self.value
-		else:
-			data[self.key] = self.value
-		self._save(data)
+		defer = _write_behind["loop"] is not None
+		value = config_format.normalize(self.value)
+		self.backend.write(self.key, value, self.guild_id, defer=defer)
+		_written(self.key, self.guild_id, value, defer)
+
+def _written(key, guild_id, value, defer):
+	"""
+	Runs after a successful write: wakes the write-behind flusher and
+	notifies subscribers of the key.
+	"""
+	if defer:
+		_write_behind["loop"].call_soon_threadsafe(_wake_flusher)
+	if key in _subscribers:
+		_notify(key, guild_id, value)
+
+# -----------------------------
+# Atomic read-modify-write
+# -----------------------------
+def update_config(key, fn, guild_id=None):
+	"""
+	Atomically replaces a stored value with fn(current_value).
+
+	fn receives a private copy of the current value (None if unset) and returns
+	the new value, which is normalized like SetConfig values. The read, fn and the write happen under the backend's lock
+	and its file lock (or database transaction), so concurrent updates to the
+	same value are not lost, also between processes. Updates are therefore
+	always written immediately, even with write-behind enabled.
+
+	Args:
+		key (str): The configuration key to update.
+		fn (callable): current value -> new value. Must not block.
+		guild_id (str|int, optional): Guild ID for per-server values.
+
+	Returns:
+		The new value.
+	"""
+	guild_id = str(guild_id) if guild_id else None
+	# A deferred update would be persisted as its result and overwrite changes
+	# other processes made to the value in the meantime.
+	value = get_backend().update(key, lambda current: config_format.normalize(fn(current)), guild_id, defer=False)
+	_written(key, guild_id, value, False)
+	return copy.deepcopy(value)
+
+def append_config(key, item, guild_id=None):
+	"""
+	Atomically appends an item to a list value, creating the list if unset.
+
+	Args:
+		key (str): The configuration key holding the list.
+		item (any): The item to append.
+		guild_id (str|int, optional): Guild ID for per-server values.
+	"""
+	item = copy.deepcopy(item)
+
+	def append(values):
+		values = values if isinstance(values, list) else []
+		values.append(item)
+		return values
+
+	update_config(key, append, guild_id=guild_id)
+
+def remove_config(key, predicate, guild_id=None):
+	"""
+	Atomically removes every item of a list value matching the predicate.
+
+	Args:
+		key (str): The configuration key holding the list.
+		predicate (callable): item -> bool, True for items to remove.
+		guild_id (str|int, optional): Guild ID for per-server values.
+
+	Returns:
+		list: The removed items.
+	"""
+	removed = []
+
+	def remove(values):
+		values = values if isinstance(values, list) else []
+		kept = []
+		for item in values:
+			(removed if predicate(item) else kept).append(item)
+		return kept
+
+	update_config(key, remove, guild_id=guild_id)
+	return removed
+
+# -----------------------------
+# Change subscriptions
+# -----------------------------
+def subscribe(key, callback):
+	"""
+	Registers a callback for writes to a key.
+
+	The callback is called as callback(key, guild_id, value) on the event loop
+	after each successful write, where guild_id is a string or None and value
+	is a copy of the new value. It may be a plain function or a coroutine
+	function; coroutines are scheduled as tasks. The writer never waits for it.
+	Without a running event loop (scripts) the callback is called directly.
+
+	Args:
+		key (str): The configuration key to watch.
+		callback (callable): Function or coroutine function to call.
+	"""
+	_subscribers.setdefault(key, []).append(callback)
+
+def unsubscribe(key, callback):
+	"""
+	Removes a callback registered with subscribe().
+	"""
+	callbacks = _subscribers.get(key, [])
+	if callback in callbacks:
+		callbacks.remove(callback)
+	if not callbacks:
+		_subscribers.pop(key, None)
+
+def _notify(key, guild_id, value):
+	"""
+	Hands a change to the subscribers of its key on the event loop.
+	"""
+	try:
+		loop = asyncio.get_running_loop()
+	except RuntimeError:
+		loop = _loop
+
+	if loop is None or loop.is_closed():
+		_dispatch(key, guild_id, value)
+		return
+	loop.call_soon_threadsafe(_dispatch, key, guild_id, value)
+
+def _dispatch(key, guild_id, value):
+	"""
+	Calls every subscriber of a key. Errors are logged and do not affect other subscribers.
+	"""
+	for callback in list(_subscribers.get(key, [])):
+		try:
+			result = callback(key, guild_id, copy.deepcopy(value))
+			if asyncio.iscoroutine(result):
+				try:
+					asyncio.get_running_loop().create_task(result)
+				except RuntimeError:
+					result.close()	# no event loop to run it on
+		except Exception as e:
+			print(f"\033[33m[Config]\033[31m Subscriber for '{key}' failed: {e}\033[0m")
+
+# -----------------------------
+# Async configuration API
+# -----------------------------
+def _get_executor():
+	"""
+	Returns the config I/O executor, creating it on first use.
+	"""
+	global _executor
+	if _executor is None:
+		_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pybot-config")
+	return _executor
+
+async def _run_io(fn, *args, **kwargs):
+	"""
+	Runs a blocking config operation on the config I/O thread.
+	"""
+	global _loop
+	loop = _loop = asyncio.get_running_loop()
+	return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+async def aget_config(key, guild_id=None):
+	"""
+	Awaitable GetConfig(key, guild_id).value().
+
+	Args:
+		key (str): The configuration key to retrieve.
+		guild_id (str|int, optional): Guild ID for per-server values.
+	"""
+	return await _run_io(lambda: GetConfig(key, guild_id=guild_id).value())
+
+async def aget_config_all(key):
+	"""
+	Awaitable GetConfig(key).all().
+
+	Args:
+		key (str): The configuration key to retrieve.
+	"""
+	return await _run_io(lambda: GetConfig(key).all())
+
+async def aset_config(key, value, guild_id=None):
+	"""
+	Awaitable SetConfig(key, value, guild_id).
+
+	Args:
+		key (str): The configuration key to set.
+		value (any): The value to store.
+		guild_id (str|int, optional): Guild ID for per-server values.
+	"""
+	await _run_io(SetConfig, key, value, guild_id=guild_id)
+
+async def aupdate_config(key, fn, guild_id=None):
+	"""
+	Awaitable update_config(). fn runs on the config I/O thread.
+	"""
+	return await _run_io(update_config, key, fn, guild_id=guild_id)
+
+async def aappend_config(key, item, guild_id=None):
+	"""
+	Awaitable append_config().
+	"""
+	await _run_io(append_config, key, item, guild_id=guild_id)
+
+async def aremove_config(key, predicate, guild_id=None):
+	"""
+	Awaitable remove_config(). predicate runs on the config I/O thread.
+	"""
+	return await _run_io(remove_config, key, predicate, guild_id=guild_id)
@@ -0,0 +1,108 @@
+"""
+File: config_migrate.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-16
+
+Description:
+One-shot migration of an existing data.json into another config backend.
+Run from the pybot directory:
+
+	python -m library.config_migrate [data.json] [data.db]
+	python -m library.config_migrate --sharded [data.json] [data_dir]
+	python -m library.config_migrate --export [data.json] [export.json]
+
+Top-level values that are dicts keyed by guild IDs become one entry per guild;
+everything else is stored as a single global entry. Existing entries are overwritten.
+
+--export writes a pretty-printed JSON copy of a data.json in any format (including
+a pending journal), for reading or editing by hand.
+"""
+
+import argparse
+import os
+
+from library import config_format
+from library.config_manager import CONFIG_FILE, DATA_DIR
+
+
+def _is_guild_map(value):
+	"""
+	Returns True if the value looks like {guild_id: value, ...}.
+	"""
+	return isinstance(value, dict) and bool(value) and all(k.isdigit() for k in value)
+
+def import_json(json_path, backend):
+	"""
+	Writes every key of a JSON config file into a backend and closes it.
+
+	Args:
+		json_path (str): Source data.json.
+		backend (ConfigBackend): Target backend.
+
+	Returns:
+		int: Number of entries written.
+	"""
+	with open(json_path, "rb") as f:
+		data = config_format.loads(f.read())
+
+	for key, value in data.items():
+		if _is_guild_map(value):
+			for guild_id, guild_value in value.items():
+				backend.write(key, guild_value, guild_id, defer=True)
+		else:
+			backend.write(key, value, None, defer=True)
+
+	count = backend.persist()
+	backend.close()
+	return count
+
+def migrate(json_path, db_path):
+	"""
+	Imports a JSON config file into a SQLite database, created if missing.
+
+	Returns:
+		int: Number of rows written.
+	"""
+	from library.config_sqlite import SQLiteBackend
+	return import_json(json_path, SQLiteBackend(db_path))
+
+def migrate_sharded(json_path, directory):
+	"""
+	Splits a JSON config file into per-guild shard files under directory.
+
+	Returns:
+		int: Number of entries written.
+	"""
+	from library.config_sharded import ShardedBackend
+	return import_json(json_path, ShardedBackend(directory))
+
+def export_json(json_path, target):
+	"""
+	Writes a config file of any format, with its journal replayed, as pretty-printed JSON.
+	"""
+	from library.config_journal import JournalBackend
+	backend = JournalBackend(json_path)
+	backend.export(target)
+	backend.close()
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Import data.json into another config backend, or export it as JSON.")
+	parser.add_argument("--sharded", action="store_true", help="write per-guild shard files instead of SQLite")
+	parser.add_argument("--export", action="store_true", help="write a readable JSON copy instead of migrating")
+	parser.add_argument("source", nargs="?", default=CONFIG_FILE)
+	parser.add_argument("target", nargs="?")
+	args = parser.parse_args()
+
+	if args.export:
+		target = args.target or os.path.join(DATA_DIR, "export.json")
+		export_json(args.source, target)
+		print(f"\033[33m[Config]\033[0m Exported {args.source} to {target}")
+	else:
+		if args.sharded:
+			target = args.target or DATA_DIR
+			count = migrate_sharded(args.source, target)
+		else:
+			target = args.target or os.path.join(DATA_DIR, "data.db")
+			count = migrate(args.source, target)
+		print(f"\033[33m[Config]\033[0m Migrated {count} entries from {args.source} to {target}")
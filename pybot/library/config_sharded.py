@@ -0,0 +1,249 @@
+"""
+File: config_sharded.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Sharded storage backend for the config system. Every guild gets its own file
+(data/guilds/<guild_id>.json) holding that guild's keys, and global values live
+in data/global.json. A guild's change only rewrites that guild's file, and
+guild files are only parsed when the guild is first accessed.
+
+Loaded guilds are kept in memory up to a limit and evicted least-recently-used.
+Bulk reads (GetConfig.all() / GetConfig.items()) stream over the guild files
+without pulling them all into memory.
+
+Select it with PYBOT_CONFIG_BACKEND=sharded (PYBOT_CONFIG_SHARD_CACHE sets how
+many guilds stay loaded). An existing data.json can be split with config_migrate.py.
+
+Several processes may share the directory. Writes are read-modify-write under an
+exclusive lock on shards.lock, and a loaded shard is reloaded only when its file's
+stamp shows another process wrote it.
+"""
+
+import copy
+import json
+import os
+
+from collections import OrderedDict
+from threading import Lock
+
+from library.config_manager import ConfigBackend, _stat
+from library.file_lock import FileLock
+
+
+class ShardedBackend(ConfigBackend):
+	"""
+	Config backend storing one JSON file per guild plus one global file.
+
+	Shard dictionaries are replaced on write, never modified in place, so values
+	handed out by read() never change underneath the caller. Deferred changes are
+	kept per key and re-applied on top of the file when persisted, so changes to
+	other keys made by other processes are preserved.
+	"""
+
+	def __init__(self, directory, max_guilds=1000):
+		"""
+		Args:
+			directory (str): Data directory holding global.json and guilds/.
+			max_guilds (int): Number of guild shards kept in memory.
+		"""
+		self.directory = directory
+		self.guild_dir = os.path.join(directory, "guilds")
+		self.global_path = os.path.join(directory, "global.json")
+		self.max_guilds = max_guilds
+		self.lock = Lock()
+
+		self.shards = OrderedDict()	# guild_id (None for global) -> (data, stamp), LRU order
+		self.pending = {}			# guild_id -> {key: value} deferred changes
+		self.changes = 0			# deferred change count, returned by persist()
+		self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+		os.makedirs(self.guild_dir, exist_ok=True)
+		self.file_lock = FileLock(os.path.join(directory, "shards.lock"))
+
+	def _path(self, guild_id):
+		"""
+		Returns the file for a guild shard, or the global file for None.
+		"""
+		if guild_id is None:
+			return self.global_path
+		if not guild_id.isdigit():
+			raise ValueError(f"Invalid guild id: {guild_id!r}")
+		return os.path.join(self.guild_dir, guild_id + ".json")
+
+	def _read_file(self, path):
+		"""
+		Parses a shard file, returning {} if it does not exist.
+		"""
+		try:
+			with open(path, "r") as f:
+				return json.load(f)
+		except FileNotFoundError:
+			return {}
+
+	def _write_file(self, guild_id, data):
+		"""
+		Writes a shard file and returns its new stamp.
+		Must hold self.lock and self.file_lock.
+		"""
+		path = self._path(guild_id)
+		tmp = path + ".tmp"
+		with open(tmp, "w") as f:
+			json.dump(data, f, indent=4)
+		os.replace(tmp, path)
+		return _stat(path)
+
+	def _shard(self, guild_id):
+		"""
+		Returns the data of one shard, loading it on first access and reloading
+		it if the file changed. Must hold self.lock.
+		"""
+		entry = self.shards.get(guild_id)
+		if entry is not None and (guild_id in self.pending or entry[1] == _stat(self._path(guild_id))):
+			self.shards.move_to_end(guild_id)
+			self.stats["hits"] += 1
+			return entry[0]
+
+		self.stats["misses"] += 1
+		path = self._path(guild_id)
+		stamp = _stat(path)
+		data = self._read_file(path)
+		self._cache(guild_id, data, stamp)
+		return data
+
+	def _cache(self, guild_id, data, stamp):
+		"""
+		Stores a shard in the LRU, evicting the oldest guild shards over the limit.
+		Evicted shards with deferred changes are persisted first. Must hold self.lock.
+		"""
+		self.shards[guild_id] = (data, stamp)
+		self.shards.move_to_end(guild_id)
+
+		loaded = len(self.shards) - (None in self.shards)
+		for oldest in list(self.shards):
+			if loaded <= self.max_guilds:
+				break
+			if oldest is None or oldest == guild_id:
+				continue
+			if oldest in self.pending:
+				if self.file_lock.locked:
+					self._persist_shard(oldest)
+				else:
+					with self.file_lock:
+						self._persist_shard(oldest)
+			del self.shards[oldest]
+			self.stats["evictions"] += 1
+			loaded -= 1
+
+	def _modify(self, guild_id, key, fn, defer):
+		"""
+		Stores fn(current) as the new value in a copy of the shard and publishes
+		it. Immediate changes are made under the file lock on fresh data and
+		written; deferred changes are recorded for persist(). Must hold self.lock.
+		"""
+		if defer:
+			data = dict(self._shard(guild_id))
+			data[key] = value = fn(data.get(key))
+			self.pending.setdefault(guild_id, {})[key] = value
+			self.changes += 1
+			# Keep the stamp of the file this is based on, so persist() can tell
+			# whether another process wrote the shard in the meantime.
+			self._cache(guild_id, data, self.shards[guild_id][1])
+			return value
+
+		with self.file_lock:
+			# Deferred changes would hide writes of other processes from _shard().
+			if guild_id in self.pending:
+				self._persist_shard(guild_id)
+			data = dict(self._shard(guild_id))
+			data[key] = value = fn(data.get(key))
+			self._cache(guild_id, data, self._write_file(guild_id, data))
+		return value
+
+	def _persist_shard(self, guild_id):
+		"""
+		Writes a shard's deferred changes, re-applied on top of the file if
+		another process changed it. Must hold self.lock and self.file_lock.
+		"""
+		changes = self.pending[guild_id]
+		data, stamp = self.shards[guild_id]
+
+		path = self._path(guild_id)
+		if stamp != _stat(path):
+			data = self._read_file(path)
+			data.update(changes)
+		self.shards[guild_id] = (data, self._write_file(guild_id, data))
+		# Dropped only now, so changes whose write failed are retried.
+		del self.pending[guild_id]
+
+	def read(self, key, guild_id):
+		if guild_id:
+			with self.lock:
+				return self._shard(guild_id).get(key)
+
+		with self.lock:
+			value = self._shard(None).get(key)
+		if value is None:
+			value = self.read_all(key) or None
+		return value
+
+	def read_all(self, key):
+		values = dict(self.iter_all(key))
+		if not values:
+			with self.lock:
+				value = self._shard(None).get(key)
+			if isinstance(value, dict):
+				return value
+		return values
+
+	def iter_all(self, key):
+		"""
+		Yields (guild_id, value) for every guild holding the key. Loaded shards
+		are served from memory; other guild files are parsed one at a time and
+		not kept.
+		"""
+		with self.lock:
+			loaded = {guild_id: data for guild_id, (data, _) in self.shards.items() if guild_id is not None}
+
+		for guild_id, data in loaded.items():
+			if key in data:
+				yield guild_id, data[key]
+
+		with os.scandir(self.guild_dir) as entries:
+			for entry in entries:
+				if not entry.name.endswith(".json"):
+					continue
+				guild_id = entry.name[:-5]
+				if guild_id in loaded:
+					continue
+				data = self._read_file(entry.path)
+				if key in data:
+					yield guild_id, data[key]
+
+	def write(self, key, value, guild_id, defer=False):
+		with self.lock:
+			self._modify(guild_id, key, lambda current: value, defer)
+
+	def update(self, key, fn, guild_id, defer=False):
+		with self.lock:
+			return self._modify(guild_id, key, lambda current: fn(copy.deepcopy(current)), defer)
+
+	def persist(self):
+		with self.lock:
+			if self.pending:
+				with self.file_lock:
+					for guild_id in list(self.pending):
+						self._persist_shard(guild_id)
+
+			count, self.changes = self.changes, 0
+			return count
+
+	def cache_stats(self):
+		return dict(self.stats)
+
+	def invalidate(self):
+		with self.lock:
+			for guild_id in list(self.shards):
+				if guild_id not in self.pending:
+					del self.shards[guild_id]
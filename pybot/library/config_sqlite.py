@@ -0,0 +1,174 @@
+"""
+File: config_sqlite.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-16
+
+Description:
+SQLite storage backend for the config system. Stores one row per (key, guild_id),
+so reading or writing a single guild's value only touches that row instead of the
+whole document. The database runs in WAL mode so readers are not blocked by writes.
+Several processes may share the database; read-modify-write updates run inside an
+immediate transaction so they cannot interleave.
+
+Select it with PYBOT_CONFIG_BACKEND=sqlite (PYBOT_CONFIG_DB sets the database path).
+An existing data.json can be imported with config_migrate.py.
+"""
+
+import copy
+import json
+import sqlite3
+
+from threading import Lock
+
+from library.config_manager import ConfigBackend
+from library.file_lock import FileLock
+
+# guild_id column value used for global entries
+GLOBAL = ""
+
+
+class SQLiteBackend(ConfigBackend):
+	"""
+	Config backend storing JSON-encoded values in a SQLite table.
+
+	A global read of a key that only has per-guild rows returns the dict of
+	guild values, matching the JSON backend. Global and per-guild values for
+	the same key are stored separately and should not be mixed.
+	"""
+
+	def __init__(self, path):
+		"""
+		Args:
+			path (str): Database file, created if it does not exist.
+		"""
+		self.path = path
+		self.lock = Lock()
+		self.pending = {}	# (key, guild_id) -> value, deferred writes
+
+		self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+		# Switching to WAL does not wait on the busy timeout, so processes
+		# opening a new database at the same time take turns.
+		with FileLock(path + ".lock"):
+			self.conn.execute("PRAGMA journal_mode=WAL")
+			self.conn.execute("PRAGMA synchronous=NORMAL")
+			self.conn.execute(
+				"CREATE TABLE IF NOT EXISTS config ("
+				"key TEXT NOT NULL, "
+				"guild_id TEXT NOT NULL, "
+				"value TEXT NOT NULL, "
+				"PRIMARY KEY (key, guild_id)"
+				") WITHOUT ROWID"
+			)
+			self.conn.commit()
+
+	def _read_row(self, key, guild_id):
+		"""
+		Returns the decoded value of one row, or None. Must hold self.lock.
+		"""
+		if (key, guild_id) in self.pending:
+			return self.pending[(key, guild_id)]
+
+		row = self.conn.execute(
+			"SELECT value FROM config WHERE key = ? AND guild_id = ?",
+			(key, guild_id)
+		).fetchone()
+		return json.loads(row[0]) if row else None
+
+	def _read_guilds(self, key):
+		"""
+		Returns {guild_id: value} for all per-guild rows of the key. Must hold self.lock.
+		"""
+		rows = self.conn.execute(
+			"SELECT guild_id, value FROM config WHERE key = ? AND guild_id != ?",
+			(key, GLOBAL)
+		)
+		values = {guild_id: json.loads(value) for guild_id, value in rows}
+
+		for (pending_key, guild_id), value in self.pending.items():
+			if pending_key == key and guild_id != GLOBAL:
+				values[guild_id] = value
+		return values
+
+	def read(self, key, guild_id):
+		with self.lock:
+			if guild_id:
+				return self._read_row(key, guild_id)
+
+			value = self._read_row(key, GLOBAL)
+			if value is None:
+				value = self._read_guilds(key) or None
+			return value
+
+	def read_all(self, key):
+		with self.lock:
+			values = self._read_guilds(key)
+			if not values:
+				value = self._read_row(key, GLOBAL)
+				if isinstance(value, dict):
+					return value
+			return values
+
+	def _store(self, key, value, guild_id, defer):
+		"""
+		Upserts one row, or holds it in pending if deferred. Must hold self.lock.
+		"""
+		if defer:
+			self.pending[(key, guild_id)] = value
+			return
+
+		self.pending.pop((key, guild_id), None)
+		with self.conn:
+			self.conn.execute(
+				"INSERT INTO config (key, guild_id, value) VALUES (?, ?, ?) "
+				"ON CONFLICT (key, guild_id) DO UPDATE SET value = excluded.value",
+				(key, guild_id, json.dumps(value))
+			)
+
+	def write(self, key, value, guild_id, defer=False):
+		with self.lock:
+			self._store(key, value, guild_id or GLOBAL, defer)
+
+	def update(self, key, fn, guild_id, defer=False):
+		guild_id = guild_id or GLOBAL
+		with self.lock:
+			if defer:
+				value = fn(copy.deepcopy(self._read_row(key, guild_id)))
+				self._store(key, value, guild_id, defer)
+				return value
+
+			# BEGIN IMMEDIATE takes the database write lock before reading, so
+			# other processes cannot change the row between read and write.
+			self.conn.execute("BEGIN IMMEDIATE")
+			try:
+				value = fn(copy.deepcopy(self._read_row(key, guild_id)))
+				self.pending.pop((key, guild_id), None)
+				self.conn.execute(
+					"INSERT INTO config (key, guild_id, value) VALUES (?, ?, ?) "
+					"ON CONFLICT (key, guild_id) DO UPDATE SET value = excluded.value",
+					(key, guild_id, json.dumps(value))
+				)
+			except BaseException:
+				self.conn.rollback()
+				raise
+			self.conn.commit()
+			return value
+
+	def persist(self):
+		with self.lock:
+			if not self.pending:
+				return 0
+
+			rows = [(key, guild_id, json.dumps(value)) for (key, guild_id), value in self.pending.items()]
+			with self.conn:
+				self.conn.executemany(
+					"INSERT INTO config (key, guild_id, value) VALUES (?, ?, ?) "
+					"ON CONFLICT (key, guild_id) DO UPDATE SET value = excluded.value",
+					rows
+				)
+			self.pending.clear()
+			return len(rows)
+
+	def close(self):
+		self.persist()
+		with self.lock:
+			self.conn.close()
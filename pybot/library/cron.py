@@ -0,0 +1,180 @@
+"""
+File: cron.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-16
+
+Description:
+Parser for five-field cron expressions ("minute hour day-of-month month day-of-week")
+and computation of their next fire time in a given timezone.
+
+Each field accepts "*", numbers, ranges ("1-5"), steps ("*/15", "0-30/10") and
+comma separated lists of those. Months and weekdays also accept three letter
+names ("jan", "mon"); Sunday is 0 or 7. As in Vixie cron, when both day-of-month
+and day-of-week are restricted a day matching either one fires. The aliases
+@hourly, @daily, @midnight, @weekly, @monthly, @yearly and @annually are supported.
+"""
+
+import datetime
+
+import pytz
+
+ALIASES = {
+	"@hourly": "0 * * * *",
+	"@daily": "0 0 * * *",
+	"@midnight": "0 0 * * *",
+	"@weekly": "0 0 * * 0",
+	"@monthly": "0 0 1 * *",
+	"@yearly": "0 0 1 1 *",
+	"@annually": "0 0 1 1 *",
+}
+
+MONTHS = {name: i for i, name in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+WEEKDAYS = {name: i for i, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))}
+
+# (name, lowest, highest, names)
+FIELDS = (
+	("minute", 0, 59, None),
+	("hour", 0, 23, None),
+	("day", 1, 31, None),
+	("month", 1, 12, MONTHS),
+	("weekday", 0, 7, WEEKDAYS),
+)
+
+# A matching time exists within 4 years unless the expression can never fire (e.g. "0 0 30 2 *").
+MAX_DAYS = 366 * 4 + 1
+
+
+def _parse_value(value, low, high, names, field_name):
+	"""
+	Parse one number or name of a field.
+	"""
+	value = value.lower()
+	if names and value in names:
+		return names[value]
+	if not value.isdigit():
+		raise ValueError(f"Invalid cron {field_name}: {value!r}")
+	number = int(value)
+	if not low <= number <= high:
+		raise ValueError(f"Cron {field_name} {number} is out of range {low}-{high}")
+	return number
+
+def _parse_field(text, low, high, names, field_name):
+	"""
+	Parse one field into the set of values it matches.
+
+	Returns:
+		tuple: (values, restricted) where restricted is False for "*".
+	"""
+	values = set()
+	for part in text.split(","):
+		step = 1
+		if "/" in part:
+			part, step_text = part.split("/", 1)
+			if not step_text.isdigit() or int(step_text) == 0:
+				raise ValueError(f"Invalid cron step in {field_name}: {step_text!r}")
+			step = int(step_text)
+
+		if part == "*":
+			start, end = low, high
+		elif "-" in part:
+			start, end = (_parse_value(value, low, high, names, field_name) for value in part.split("-", 1))
+			if start > end:
+				raise ValueError(f"Invalid cron range in {field_name}: {part!r}")
+		else:
+			start = _parse_value(part, low, high, names, field_name)
+			end = high if step > 1 else start
+
+		values.update(range(start, end + 1, step))
+
+	return frozenset(values), text != "*"
+
+
+class CronExpression:
+	"""
+	A parsed cron expression.
+
+	Attributes:
+		expression (str): The original expression.
+		minutes, hours, days, months, weekdays (frozenset): Matching values per field.
+			Weekdays use 0 = Sunday.
+	"""
+
+	__slots__ = ("expression", "minutes", "hours", "days", "months", "weekdays", "day_restricted", "weekday_restricted")
+
+	def __init__(self, expression: str):
+		"""
+		Args:
+			expression (str): e.g. "*/15 9-17 * * mon-fri" or "@daily".
+
+		Raises:
+			ValueError: If the expression is malformed.
+		"""
+		self.expression = expression
+		fields = ALIASES.get(expression.strip().lower(), expression).split()
+		if len(fields) != 5:
+			raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: {expression!r}")
+
+		parsed = [_parse_field(text, low, high, names, name) for text, (name, low, high, names) in zip(fields, FIELDS)]
+		(self.minutes, _), (self.hours, _), (self.days, self.day_restricted), (self.months, _), (weekdays, self.weekday_restricted) = parsed
+		self.weekdays = frozenset(day % 7 for day in weekdays)
+
+	def __repr__(self):
+		return f"CronExpression({self.expression!r})"
+
+	def _day_matches(self, day):
+		"""
+		Check the day-of-month and day-of-week fields for a date.
+		"""
+		in_days = day.day in self.days
+		in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+		if self.day_restricted and self.weekday_restricted:
+			return in_days or in_weekdays
+		return in_days and in_weekdays
+
+	def next_after(self, after: float, timezone=None) -> float:
+		"""
+		Compute the first fire time strictly after a point in time.
+
+		Args:
+			after (float): Epoch seconds.
+			timezone (pytz timezone | str, optional): Zone the fields are evaluated in. UTC if None.
+
+		Returns:
+			float: Epoch seconds of the next fire time.
+
+		Behavior:
+			- Times skipped by a DST change fire at the matching time after the gap.
+			- Times repeated by a DST change fire once.
+		"""
+		if timezone is None:
+			timezone = pytz.utc
+		elif isinstance(timezone, str):
+			timezone = pytz.timezone(timezone)
+
+		# Evaluate in naive local wall time, one minute past "after".
+		local = datetime.datetime.fromtimestamp(after, timezone).replace(tzinfo=None, second=0, microsecond=0)
+		candidate = local + datetime.timedelta(minutes=1)
+		limit = candidate + datetime.timedelta(days=MAX_DAYS)
+
+		while candidate < limit:
+			if candidate.month not in self.months:
+				year, month = divmod(candidate.month, 12)
+				candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+				continue
+			if not self._day_matches(candidate):
+				candidate = (candidate + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+				continue
+			if candidate.hour not in self.hours:
+				candidate = (candidate + datetime.timedelta(hours=1)).replace(minute=0)
+				continue
+			if candidate.minute not in self.minutes:
+				candidate += datetime.timedelta(minutes=1)
+				continue
+
+			fire = timezone.localize(candidate, is_dst=False).timestamp() if hasattr(timezone, "localize") \
+				else candidate.replace(tzinfo=timezone).timestamp()
+			if fire > after:
+				return fire
+			candidate += datetime.timedelta(minutes=1)
+
+		raise ValueError(f"Cron expression never fires: {self.expression!r}")
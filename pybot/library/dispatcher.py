@@ -0,0 +1,205 @@
+"""
+File: dispatcher.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Keyed dispatcher used to run command handlers off the gateway event handler.
+Jobs with the same key (a guild, or a DM channel) run one at a time in submission
+order; jobs with different keys run in parallel, at most `workers` at once.
+Keys take turns for a free slot, so one busy guild cannot starve the others.
+
+A job that waits for a user's reply (see released()) gives back its slot and its
+key's turn for the duration of the wait, so a prompt neither blocks later commands
+of its own guild nor occupies one of the workers.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import time
+import traceback
+
+from collections import deque
+
+
+class _Turn:
+	"""
+	State of one running job, reachable from inside the job through _current.
+	"""
+
+	__slots__ = ("dispatcher", "key", "task", "done", "holding")
+
+	def __init__(self, dispatcher, key):
+		self.dispatcher = dispatcher
+		self.key = key
+		self.task = None			# task running the job; tasks it spawns inherit _current
+		self.done = asyncio.Event()	# set once the key may start its next job
+		self.holding = True			# whether the job holds a worker slot
+
+# Turn of the dispatcher job running in the current task, if any.
+_current = contextvars.ContextVar("dispatch_turn", default=None)
+
+
+@contextlib.asynccontextmanager
+async def released():
+	"""
+	Give up the current job's worker slot and its key's turn while the body runs,
+	e.g. while a command waits for a reply. The slot is taken back afterwards;
+	the key's later jobs may meanwhile have started. Outside a dispatcher job,
+	including in tasks the job spawned, this does nothing.
+	"""
+	turn = _current.get()
+	if turn is None or not turn.holding or turn.task is not asyncio.current_task():
+		yield
+		return
+
+	dispatcher = turn.dispatcher
+	turn.holding = False
+	turn.done.set()
+	dispatcher.busy -= 1
+	dispatcher.waiting += 1
+	dispatcher.slots.release()
+	cancelled = False
+	try:
+		yield
+	except asyncio.CancelledError:
+		# The job is being stopped; let it finish without a slot.
+		cancelled = True
+		raise
+	finally:
+		dispatcher.waiting -= 1
+		if not cancelled:
+			await dispatcher.slots.acquire()
+			turn.holding = True
+			dispatcher.busy += 1
+
+
+class KeyedDispatcher:
+	"""
+	Runs coroutine jobs serialized per key with a bounded number running at once.
+
+	Attributes:
+		workers (int): Maximum number of jobs running at once, i.e. keys processed in parallel.
+	"""
+
+	def __init__(self, workers=16):
+		"""
+		Args:
+			workers (int): Maximum number of jobs running at once.
+		"""
+		self.workers = workers
+		self.queues = {}		# key -> deque of (job, args, submitted_at)
+		self.runners = {}		# key -> task starting that key's jobs in order
+		self.jobs = set()		# job tasks that have not finished
+		self.slots = None		# asyncio.Semaphore of free workers, created on first submit
+		self.busy = 0
+		self.waiting = 0
+		self.pending = 0
+		self.counters = {"submitted": 0, "processed": 0, "failures": 0, "high_water": 0, "wait_time": 0.0}
+
+	def submit(self, key, job, *args):
+		"""
+		Queue job(*args) behind earlier jobs of the same key.
+		Must be called from the event loop.
+
+		Args:
+			key: Serialization key, e.g. a guild id.
+			job (callable): Coroutine function to run.
+		"""
+		if self.slots is None:
+			self.slots = asyncio.Semaphore(self.workers)
+
+		queue = self.queues.get(key)
+		if queue is None:
+			# No queue means no runner owns the key; start one.
+			queue = self.queues[key] = deque()
+			self.runners[key] = asyncio.create_task(self._run_key(key, queue), name=f"dispatch-{key}")
+		queue.append((job, args, time.perf_counter()))
+
+		self.pending += 1
+		self.counters["submitted"] += 1
+		self.counters["high_water"] = max(self.counters["high_water"], self.pending)
+
+	async def _run_key(self, key, queue):
+		"""
+		Start a key's jobs one at a time, each once the previous one finished or
+		released its turn, and take a worker slot for each.
+		"""
+		try:
+			while queue:
+				await self.slots.acquire()
+				job, args, submitted_at = queue.popleft()
+
+				self.pending -= 1
+				self.busy += 1
+				self.counters["wait_time"] += time.perf_counter() - submitted_at
+
+				turn = _Turn(self, key)
+				task = asyncio.create_task(self._run(turn, job, args))
+				self.jobs.add(task)
+				task.add_done_callback(self.jobs.discard)
+				await turn.done.wait()
+		finally:
+			del self.queues[key]
+			del self.runners[key]
+
+	async def _run(self, turn, job, args):
+		"""
+		Run one job, then free its slot and its key's turn.
+		"""
+		turn.task = asyncio.current_task()
+		_current.set(turn)
+		try:
+			await job(*args)
+		except Exception as e:
+			self.counters["failures"] += 1
+			print(f"\033[33m[Dispatch]\033[31m [{turn.key}]\033[0m Job failed: \033[31m{e!r}\033[0m")
+			traceback.print_exception(e)
+		finally:
+			if turn.holding:
+				self.busy -= 1
+				self.slots.release()
+			self.counters["processed"] += 1
+			turn.done.set()
+
+	def stats(self):
+		"""
+		Returns:
+			dict: Counters plus the current queue depths:
+				pending    jobs waiting for a worker
+				keys       keys with queued or running jobs
+				max_depth  deepest queue of a single key
+				busy       workers running a job
+				waiting    jobs that released their worker to wait for a reply
+				avg_wait   mean seconds a job waited before it started
+		"""
+		stats = dict(self.counters)
+		started = stats["processed"] + len(self.jobs)
+		stats["pending"] = self.pending
+		stats["keys"] = len(self.queues)
+		stats["max_depth"] = max((len(queue) for queue in self.queues.values()), default=0)
+		stats["busy"] = self.busy
+		stats["waiting"] = self.waiting
+		stats["avg_wait"] = stats.pop("wait_time") / started if started else 0.0
+		return stats
+
+	async def drain(self, timeout=10):
+		"""
+		Wait up to timeout seconds for queued jobs to finish, then cancel the rest.
+
+		Returns:
+			bool: True if every queued job finished in time.
+		"""
+		deadline = time.monotonic() + timeout
+		while (self.pending or self.jobs) and time.monotonic() < deadline:
+			await asyncio.sleep(0.05)
+		finished = not (self.pending or self.jobs)
+
+		tasks = list(self.runners.values()) + list(self.jobs)
+		for task in tasks:
+			task.cancel()
+		await asyncio.gather(*tasks, return_exceptions=True)
+		self.slots = None
+		self.pending = 0
+		return finished
@@ -0,0 +1,120 @@
+"""
+File: fetch_cache.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-16
+
+Description:
+Small async cache for objects fetched over the Discord REST API (messages, members).
+Entries expire after a TTL and the least recently used entry is evicted once the
+cache is full. Concurrent requests for the same key share one fetch (single-flight),
+so a burst of events about one message costs a single REST call.
+"""
+
+import asyncio
+import time
+
+from collections import OrderedDict
+
+
+class FetchCache:
+	"""
+	Bounded LRU + TTL cache of awaited fetch results.
+
+	Failed fetches are not cached; every caller waiting on the fetch gets the
+	exception. invalidate() also discards a fetch that is still in flight, so
+	a result that may predate the change is never stored.
+	"""
+
+	def __init__(self, max_size=1000, ttl=60):
+		"""
+		Args:
+			max_size (int): Maximum number of cached entries.
+			ttl (float): Seconds an entry stays valid.
+		"""
+		self.max_size = max_size
+		self.ttl = ttl
+		self.entries = OrderedDict()	# key -> (value, expires_at), LRU order
+		self.inflight = {}				# key -> asyncio.Task running the fetch
+		self.counters = {"hits": 0, "misses": 0, "shared": 0, "evictions": 0, "invalidations": 0}
+
+	async def get(self, key, fetch):
+		"""
+		Return the cached value for key, fetching it if missing or expired.
+
+		Args:
+			key: Cache key, e.g. a message id or (guild_id, user_id).
+			fetch (callable): Coroutine function returning the value.
+
+		Returns:
+			The fetched or cached value.
+		"""
+		entry = self.entries.get(key)
+		if entry is not None:
+			if entry[1] > time.monotonic():
+				self.entries.move_to_end(key)
+				self.counters["hits"] += 1
+				return entry[0]
+			del self.entries[key]
+
+		task = self.inflight.get(key)
+		if task is not None:
+			self.counters["shared"] += 1
+		else:
+			self.counters["misses"] += 1
+			task = asyncio.ensure_future(fetch())
+			self.inflight[key] = task
+			task.add_done_callback(lambda done: self._store(key, done))
+
+		# Shielded so one cancelled caller does not cancel the fetch for the others.
+		return await asyncio.shield(task)
+
+	def _store(self, key, task):
+		"""
+		Cache the result of a finished fetch, unless it was invalidated meanwhile.
+		"""
+		if self.inflight.get(key) is not task:
+			return
+		del self.inflight[key]
+
+		if task.cancelled() or task.exception() is not None:
+			return
+		self.put(key, task.result())
+
+	def put(self, key, value):
+		"""
+		Store a value obtained elsewhere (for example from a gateway event).
+		"""
+		self.inflight.pop(key, None)
+		self.entries[key] = (value, time.monotonic() + self.ttl)
+		self.entries.move_to_end(key)
+		while len(self.entries) > self.max_size:
+			self.entries.popitem(last=False)
+			self.counters["evictions"] += 1
+
+	def invalidate(self, key):
+		"""
+		Drop a cached value and detach any fetch in flight for it.
+		"""
+		found = self.entries.pop(key, None) is not None
+		found = self.inflight.pop(key, None) is not None or found
+		if found:
+			self.counters["invalidations"] += 1
+
+	def clear(self):
+		"""
+		Drop every cached value.
+		"""
+		self.entries.clear()
+		self.inflight.clear()
+
+	def stats(self):
+		"""
+		Returns:
+			dict: Counters plus current size and hit rate (cache hits and
+			shared fetches over all requests).
+		"""
+		stats = dict(self.counters)
+		requests = stats["hits"] + stats["misses"] + stats["shared"]
+		stats["size"] = len(self.entries)
+		stats["hit_rate"] = (stats["hits"] + stats["shared"]) / requests if requests else 0.0
+		return stats
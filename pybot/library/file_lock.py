@@ -0,0 +1,80 @@
+"""
+File: file_lock.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-16
+
+Description:
+Cross-process advisory file lock used by the config backends, so several bot
+processes (shards) can share one data directory without losing writes.
+
+Uses flock() on a separate lock file. On platforms without fcntl (Windows) the
+lock only opens the file and does not exclude other processes; the bot itself
+runs in a Linux container.
+"""
+
+import os
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
+
+class FileLock:
+	"""
+	Exclusive advisory lock on a lock file. Usable as a context manager.
+
+	Not re-entrant, and not a thread lock: callers serialize their own threads
+	with a threading.Lock before taking it.
+	"""
+
+	def __init__(self, path):
+		"""
+		Args:
+			path (str): Lock file, created if it does not exist.
+		"""
+		self.path = path
+		self.fd = None
+
+	def acquire(self, blocking=True):
+		"""
+		Takes the lock.
+
+		Args:
+			blocking (bool): Wait for the lock instead of failing immediately.
+
+		Returns:
+			bool: True if the lock was taken.
+		"""
+		fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+		if fcntl is not None:
+			try:
+				fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+			except BlockingIOError:
+				os.close(fd)
+				return False
+		self.fd = fd
+		return True
+
+	@property
+	def locked(self):
+		"""
+		True while this object holds the lock.
+		"""
+		return self.fd is not None
+
+	def release(self):
+		"""
+		Releases the lock.
+		"""
+		fd, self.fd = self.fd, None
+		if fcntl is not None:
+			fcntl.flock(fd, fcntl.LOCK_UN)
+		os.close(fd)
+
+	def __enter__(self):
+		self.acquire()
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		self.release()
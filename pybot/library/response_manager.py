@@ -1,14 +1,110 @@
 """
 File: response_manager.py
 Maintainer: Vintage Warhawk
-Last Edit: 2025-11-25
+Last Edit: 2026-10-17
 """
 
 import datetime
 import asyncio
+import heapq
+import itertools
+import math
+import time
+
+from collections import deque
+from dataclasses import dataclass, field
 
-from library.config_manager import SetConfig
 from library.config_manager import GetConfig
+from library.config_manager import aappend_config
+from library.config_manager import append_config
+from library.config_manager import aremove_config
+from library.dispatcher import released
+
+
+def _to_epoch(timeout_datetime):
+	"""
+	Convert a timeout datetime to epoch seconds. Naive datetimes are UTC,
+	as produced by datetime.utcnow().
+	"""
+	if timeout_datetime.tzinfo is None:
+		timeout_datetime = timeout_datetime.replace(tzinfo=datetime.timezone.utc)
+	return timeout_datetime.timestamp()
+
+def _to_datetime(deadline):
+	"""
+	Convert epoch seconds back to a naive UTC datetime.
+	"""
+	return datetime.datetime.fromtimestamp(deadline, datetime.timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(slots=True, eq=False)
+class MessageWaiter:
+	"""
+	A pending awaited message. deadline is in epoch seconds.
+
+	Callback-style waiters name a command; wait_for_message() waiters have no
+	command and carry the future to resolve and an optional check instead.
+	"""
+	seq: int
+	channel_id: int
+	user_id: int
+	timeout_message: str
+	deadline: float
+	command: str
+	future: asyncio.Future = field(default=None, kw_only=True)
+	check: object = field(default=None, kw_only=True)
+
+@dataclass(slots=True, eq=False)
+class ReactionWaiter:
+	"""
+	A pending awaited reaction. deadline is in epoch seconds.
+	See MessageWaiter for future and check.
+	"""
+	message_id: int
+	channel_id: int
+	user_id: int
+	timeout_message: str
+	deadline: float
+	command: str
+	future: asyncio.Future = field(default=None, kw_only=True)
+	check: object = field(default=None, kw_only=True)
+
+@dataclass(slots=True, eq=False)
+class StaticReaction(ReactionWaiter):
+	"""
+	A persistent reaction listener, stored in the "response_reactions" config key.
+	"""
+	guild_id: int
+
+	@classmethod
+	def from_config(cls, data):
+		"""
+		Build a record from its persisted form. Raises ValueError if the
+		timeout cannot be parsed.
+		"""
+		return cls(
+			message_id=int(data.get("message_id", 0)),
+			channel_id=int(data.get("channel_id", 0)),
+			user_id=int(data.get("user_id", 0)),
+			timeout_message=str(data.get("timeout_message", "")),
+			deadline=_to_epoch(datetime.datetime.fromisoformat(str(data.get("timeout_datetime", "")))),
+			command=str(data.get("command", "")),
+			guild_id=int(data.get("guild_id", 0)),
+		)
+
+	def to_config(self):
+		"""
+		Return the persisted form of the record.
+		"""
+		return {
+			"message_id": self.message_id,
+			"guild_id": self.guild_id,
+			"channel_id": self.channel_id,
+			"user_id": self.user_id,
+			"timeout_message": self.timeout_message,
+			"timeout_datetime": _to_datetime(self.deadline).isoformat(),
+			"command": self.command,
+		}
 
 
 class ResponseManager:
@@ -20,44 +116,178 @@ class ResponseManager:
 		- Store pending message/reaction waits.
 		- Route incoming messages/reactions to the appropriate handler class.
 		- Handle timeout expiration and notify channels.
+
+	Awaited messages are indexed by channel and user, and awaited and static
+	reactions by message, so matching an incoming event costs the same no matter
+	how many prompts or reaction messages are registered.
+
+	Timeouts are kept in a min-heap of deadlines. run_timeouts() sleeps until the
+	earliest deadline and only touches entries that actually expired. Entries that
+	were answered stay in the heap and are skipped when their deadline comes up.
 	"""
 
+	# Longest sleep of the timeout loop, so it re-checks the clock now and then
+	MAX_SLEEP = 3600
+
 	def __init__(self):
 		self.command_manager = None
 
-		# Each entry contains:
-		#   channel_id, user_id, timeout_message, timeout_datetime, command
-		self.awaiting_messages = []
+		# channel_id -> user_id (0 = any user) -> deque of MessageWaiter, oldest first.
+		self.awaiting_messages = {}
+		self.sequence = itertools.count()	# registration order across buckets
+
+		# message_id -> list of ReactionWaiter, oldest first.
+		self.awaiting_reactions = {}
+
+		# message_id -> list of StaticReaction, oldest first.
+		self.static_reactions = {}
 
-		# Each entry contains:
-		#   message_id, channel_id, user_id, timeout_message, timeout_datetime, command
-		self.awaiting_reactions = []
+		# Heap of (deadline, seq, entry)
+		self.deadlines = []
+		self.wakeup = asyncio.Event()	# set when an earlier deadline is registered
 
-		# Each entry contains:
-		#   message_id, channel_id, user_id, timeout_message, timeout_datetime, command
-		self.static_reactions = []
+		# Tasks storing newly registered static reactions in the config
+		self.saving = set()
 
-		all_reactions = GetConfig("response_reactions").all()
-		for guild_id, reactions in all_reactions.items():
+		for guild_id, reactions in GetConfig("response_reactions").items():
 			if not isinstance(reactions, list):
 				reactions = []
-			for reaction in reactions:
+			for data in reactions:
+				try:
+					reaction = StaticReaction.from_config(data)
+				except (ValueError, TypeError):
+					print(f"\033[33m[Response]\033[31m Ignoring invalid static reaction {data.get('message_id')}\033[0m")
+					continue
 
-				reaction = {
-					"message_id": int(reaction.get("message_id", 0)),
-					"guild_id": int(reaction.get("guild_id", 0)),
-					"channel_id": int(reaction.get("channel_id", 0)),
-					"user_id": int(reaction.get("user_id", 0)),
-					"timeout_message": str(reaction.get("timeout_message", "")),
-					"timeout_datetime": str(reaction.get("timeout_datetime", "")),
-					"command": str(reaction.get("command", "")),
-				}
-
-				self.static_reactions.append(reaction)
+				self.static_reactions.setdefault(reaction.message_id, []).append(reaction)
+				self._schedule(reaction)
 
 	def set_command_manager(self, cm):
 		self.command_manager = cm
 
+	# ======================================================================
+	#  Matching
+	# ======================================================================
+
+	def _first(self, entries, *args):
+		"""
+		Return the oldest entry whose check accepts the event, dropping
+		waiters whose future was cancelled along the way.
+
+		A check that raises fails its waiter's future with the exception.
+		"""
+		for entry in list(entries):
+			if entry.future is not None and entry.future.done():
+				self._unregister(entry)
+				continue
+			if entry.check is None:
+				return entry
+			try:
+				if entry.check(*args):
+					return entry
+			except Exception as e:
+				entry.future.set_exception(e)
+				self._unregister(entry)
+		return None
+
+	def match_message(self, message):
+		"""
+		Find and consume the waiter for an incoming message.
+
+		Args:
+			message (discord.Message)
+
+		Returns:
+			MessageWaiter | None: The consumed entry, or None if nobody is waiting.
+			If entry.future is set, the caller resolves it with the message;
+			otherwise it dispatches entry.command.
+
+		Notes:
+			- A waiter for the author and a waiter for any user (user_id 0) in the
+			  same channel are both candidates; the one registered first wins.
+			- Only one waiter is consumed per message.
+		"""
+		users = self.awaiting_messages.get(message.channel.id)
+		if not users:
+			return None
+
+		own = self._first(users.get(message.author.id, ()), message)
+		anyone = self._first(users.get(0, ()), message)
+
+		if own and (not anyone or own.seq < anyone.seq):
+			entry = own
+		elif anyone:
+			entry = anyone
+		else:
+			return None
+
+		self._unregister(entry)
+		return entry
+
+	def match_reaction(self, reaction, user):
+		"""
+		Find and consume the awaited reaction waiter for a reaction.
+
+		Args:
+			reaction (discord.Reaction)
+			user (discord.User): User who reacted.
+
+		Returns:
+			ReactionWaiter | None: The consumed entry, or None if nobody is waiting.
+			If entry.future is set, the caller resolves it with (reaction, user).
+		"""
+		entries = [
+			entry for entry in self.awaiting_reactions.get(reaction.message.id, ())
+			if entry.user_id in (0, user.id)
+		]
+
+		entry = self._first(entries, reaction, user)
+		if entry is not None:
+			self._unregister(entry)
+		return entry
+
+	def match_static_reaction(self, message_id, user_id):
+		"""
+		Find the static reaction registered for a reaction. Static reactions
+		stay registered until they time out, so nothing is consumed.
+
+		Args:
+			message_id (int): Message that was reacted to.
+			user_id (int): User who reacted.
+
+		Returns:
+			StaticReaction | None: The matching entry, or None.
+		"""
+		for entry in self.static_reactions.get(message_id, ()):
+			if entry.user_id in (0, user_id):
+				return entry
+		return None
+
+	def iter_awaiting_messages(self):
+		"""
+		Yield every pending awaited message entry.
+		"""
+		for users in self.awaiting_messages.values():
+			for bucket in users.values():
+				yield from bucket
+
+	def iter_awaiting_reactions(self):
+		"""
+		Yield every pending awaited reaction entry.
+		"""
+		for entries in self.awaiting_reactions.values():
+			yield from entries
+
+	def cancel_waiters(self):
+		"""
+		Cancel every pending wait_for_message()/wait_for_reaction() call.
+		Callback-style entries are left for the caller to time out.
+		"""
+		for entry in list(self.iter_awaiting_messages()) + list(self.iter_awaiting_reactions()):
+			if entry.future is not None:
+				entry.future.cancel()
+				self._unregister(entry)
+
 	# ======================================================================
 	#  Incoming Event Handlers
 	# ======================================================================
@@ -87,6 +317,23 @@ class ResponseManager:
 		except Exception as e:
 			print(f"[ResponseManager] Error in message callback: {e}")
 
+	def needs_full_message(self, command):
+		"""
+		Check whether a command's reaction callbacks want the full Message.
+
+		Raw reaction events hand on_reaction()/on_reaction_remove() a
+		PartialMessage (id, channel and guild) unless the command class sets
+		needs_full_message = True, in which case the message is fetched first.
+
+		Args:
+			command: Command to grab the callback from.
+
+		Returns:
+			bool
+		"""
+		callback = self.command_manager.hooks.get(command.lower())
+		return getattr(callback, "needs_full_message", False)
+
 	async def handle_reaction(self, client, message, reaction, user, command):
 		"""
 		Dispatch an incoming reaction event to the command class's on_reaction() method.
@@ -147,13 +394,18 @@ class ResponseManager:
 			timeout_datetime (datetime)
 			command: Command to grab callback from.
 		"""
-		self.awaiting_messages.append({
-			"channel_id": channel_id,
-			"user_id": user_id,
-			"timeout_message": timeout_message,
-			"timeout_datetime": timeout_datetime.isoformat(),
-			"command": command,
-		})
+		entry = MessageWaiter(
+			seq=next(self.sequence),
+			channel_id=channel_id,
+			user_id=user_id,
+			timeout_message=timeout_message,
+			deadline=_to_epoch(timeout_datetime),
+			command=command,
+		)
+
+		users = self.awaiting_messages.setdefault(channel_id, {})
+		users.setdefault(user_id, deque()).append(entry)
+		self._schedule(entry)
 
 	def await_reaction(self, message_id, user_id, channel_id,
 					   timeout_message, timeout_datetime, command):
@@ -168,20 +420,28 @@ class ResponseManager:
 			timeout_datetime (datetime)
 			command: Command to grab callback from.
 		"""
-		self.awaiting_reactions.append({
-			"message_id": message_id,
-			"channel_id": channel_id,
-			"user_id": user_id,
-			"timeout_message": timeout_message,
-			"timeout_datetime": timeout_datetime.isoformat(),
-			"command": command,
-		})
+		entry = ReactionWaiter(
+			message_id=message_id,
+			channel_id=channel_id,
+			user_id=user_id,
+			timeout_message=timeout_message,
+			deadline=_to_epoch(timeout_datetime),
+			command=command,
+		)
+
+		self.awaiting_reactions.setdefault(message_id, []).append(entry)
+		self._schedule(entry)
 
 	def static_reaction(self, message_id, user_id, channel_id, guild_id,
 					   timeout_message, timeout_datetime, command):
 		"""
 		Register a static reaction.
 
+		The reaction is active as soon as this returns. On the event loop it is
+		stored in the config in the background; await the returned task to wait
+		until it is stored. Without a running event loop it is stored before
+		this returns.
+
 		Args:
 			message_id (int)
 			user_id (int) — If 0, any user may respond.
@@ -189,27 +449,125 @@ class ResponseManager:
 			timeout_message (str)
 			timeout_datetime (datetime)
 			command: Command to grab callback from.
+
+		Returns:
+			asyncio.Task | None: The task storing the reaction, None without an event loop.
 		"""
 
-		reaction = {
-			"message_id": message_id,
-			"guild_id": guild_id,
-			"channel_id": channel_id,
-			"user_id": user_id,
-			"timeout_message": timeout_message,
-			"timeout_datetime": timeout_datetime.isoformat(),
-			"command": command,
-		}
+		reaction = StaticReaction(
+			message_id=message_id,
+			channel_id=channel_id,
+			user_id=user_id,
+			timeout_message=timeout_message,
+			deadline=_to_epoch(timeout_datetime),
+			command=command,
+			guild_id=guild_id,
+		)
+
+		self.static_reactions.setdefault(message_id, []).append(reaction)
+		self._schedule(reaction)
+
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			append_config("response_reactions", reaction.to_config(), guild_id=guild_id)
+			return None
+
+		task = loop.create_task(aappend_config("response_reactions", reaction.to_config(), guild_id=guild_id))
+		self.saving.add(task)
+		task.add_done_callback(self._saved)
+		return task
+
+	def _saved(self, task):
+		"""
+		Forget a finished static reaction save, logging it if it failed.
+		"""
+		self.saving.discard(task)
+		if not task.cancelled() and task.exception() is not None:
+			print(f"\033[33m[Response]\033[31m Saving static reaction failed: {task.exception()}\033[0m")
+
+	async def wait_for_message(self, channel_id, user_id=0, timeout=None, check=None):
+		"""
+		Wait for the next message in a channel.
+
+		Args:
+			channel_id (int)
+			user_id (int) — If 0, any user may respond.
+			timeout (float | None): Seconds to wait. None waits until shutdown.
+			check (callable | None): check(message) -> bool. Messages it rejects
+				are left to other waiters and commands.
+
+		Returns:
+			discord.Message
 
-		self.static_reactions.append(reaction)
+		Raises:
+			asyncio.TimeoutError: No matching message arrived in time.
+			asyncio.CancelledError: The bot is shutting down.
+		"""
+		entry = MessageWaiter(
+			seq=next(self.sequence),
+			channel_id=channel_id,
+			user_id=user_id,
+			timeout_message="",
+			deadline=math.inf if timeout is None else time.time() + timeout,
+			command=None,
+			future=asyncio.get_running_loop().create_future(),
+			check=check,
+		)
+
+		users = self.awaiting_messages.setdefault(channel_id, {})
+		users.setdefault(user_id, deque()).append(entry)
+		return await self._wait(entry)
+
+	async def wait_for_reaction(self, message_id, user_id, channel_id, timeout=None, check=None):
+		"""
+		Wait for a reaction on a message. Arguments are in the same order as
+		await_reaction() and static_reaction().
 
-		guild_reactions = GetConfig("response_reactions", guild_id=guild_id).value()
-		if guild_reactions is None:
-			guild_reactions = []
+		Args:
+			message_id (int)
+			user_id (int) — If 0, any user may react.
+			channel_id (int)
+			timeout (float | None): Seconds to wait. None waits until shutdown.
+			check (callable | None): check(reaction, user) -> bool.
 
-		guild_reactions.append(reaction)
+		Returns:
+			tuple: (discord.Reaction, discord.User)
 
-		SetConfig("response_reactions", guild_reactions, guild_id=guild_id)
+		Raises:
+			asyncio.TimeoutError: No matching reaction arrived in time.
+			asyncio.CancelledError: The bot is shutting down.
+		"""
+		entry = ReactionWaiter(
+			message_id=message_id,
+			channel_id=channel_id,
+			user_id=user_id,
+			timeout_message="",
+			deadline=math.inf if timeout is None else time.time() + timeout,
+			command=None,
+			future=asyncio.get_running_loop().create_future(),
+			check=check,
+		)
+
+		self.awaiting_reactions.setdefault(message_id, []).append(entry)
+		return await self._wait(entry)
+
+	async def _wait(self, entry):
+		"""
+		Schedule a registered future-based waiter and wait for its result.
+		The waiter is unregistered if the waiting task is cancelled. A command
+		running on the dispatcher gives up its worker while it waits.
+		"""
+		if entry.deadline != math.inf:
+			self._schedule(entry)
+		try:
+			async with released():
+				return await entry.future
+		finally:
+			# Cancelling the waiting task also cancels the future; either way
+			# the entry must not stay in the index.
+			entry.future.cancel()
+			self._unregister(entry)
 
 
 
@@ -217,7 +575,79 @@ class ResponseManager:
 	#  Timeout Processing
 	# ======================================================================
 
-	def check_timeouts(self, client):
+	def _schedule(self, entry):
+		"""
+		Add an entry's deadline to the heap, waking the timeout loop if it
+		is now the earliest one.
+
+		Args:
+			entry (MessageWaiter | ReactionWaiter | StaticReaction): The registered entry.
+		"""
+		heapq.heappush(self.deadlines, (entry.deadline, next(self.sequence), entry))
+		if self.deadlines[0][2] is entry:
+			self.wakeup.set()
+
+	def _unregister(self, entry):
+		"""
+		Remove an entry from its index.
+
+		Returns:
+			bool: False if the entry was no longer registered (already answered).
+		"""
+		if isinstance(entry, MessageWaiter):
+			users = self.awaiting_messages.get(entry.channel_id, {})
+			entries = users.get(entry.user_id, ())
+			index = None
+		elif isinstance(entry, StaticReaction):
+			entries = self.static_reactions.get(entry.message_id, ())
+			index = self.static_reactions
+		else:
+			entries = self.awaiting_reactions.get(entry.message_id, ())
+			index = self.awaiting_reactions
+
+		for i, registered in enumerate(entries):
+			if registered is entry:
+				del entries[i]
+				break
+		else:
+			return False
+
+		if entries:
+			return True
+		if index is None:
+			del users[entry.user_id]
+			if not users:
+				del self.awaiting_messages[entry.channel_id]
+		else:
+			del index[entry.message_id]
+		return True
+
+	async def run_timeouts(self, client):
+		"""
+		Process timeouts as they come due. Runs until cancelled.
+
+		Args:
+			client (discord.Client)
+				Used for sending timeout notifications.
+
+		Behavior:
+			- Sleeps until the earliest deadline, or until an earlier one is registered.
+			- Idle CPU use does not grow with the number of registered entries.
+		"""
+		while True:
+			await self.check_timeouts(client)
+
+			self.wakeup.clear()
+			delay = self.MAX_SLEEP
+			if self.deadlines:
+				delay = min(delay, max(0, self.deadlines[0][0] - time.time()))
+
+			try:
+				await asyncio.wait_for(self.wakeup.wait(), delay)
+			except asyncio.TimeoutError:
+				pass
+
+	async def check_timeouts(self, client):
 		"""
 		Process timeout expiration for message and reaction waits.
 
@@ -226,63 +656,32 @@ class ResponseManager:
 				Used for sending timeout notifications.
 
 		Behavior:
-			- If timeout reached, notify channel with timeout_message.
-			- Remove expired entries.
-			- Preserve active entries.
-		"""
-		now = datetime.datetime.utcnow()
-
-		# ------------------------------
-		#  Message timeouts
-		# ------------------------------
-		active = []
-		for entry in self.awaiting_messages:
-			timeout_datetime = datetime.datetime.fromisoformat(entry["timeout_datetime"])
-			if now >= timeout_datetime:
-				channel = client.get_channel(entry["channel_id"])
-				if channel:
-					print(f"\033[33m[Cleanup]\033[36m [Response]\033[0m {entry["timeout_message"]}")
-					asyncio.create_task(channel.send(entry["timeout_message"]))
-			else:
-				active.append(entry)
-
-		self.awaiting_messages = active
-
-		# ------------------------------
-		#  Reaction timeouts
-		# ------------------------------
-		active = []
-		for entry in self.awaiting_reactions:
-			timeout_datetime = datetime.datetime.fromisoformat(entry["timeout_datetime"])
-			if now >= timeout_datetime:
-				channel = client.get_channel(entry["channel_id"])
-				if channel:
-					print(f"\033[33m[Cleanup]\033[36m [Response]\033[0m {entry["timeout_message"]}")
-					asyncio.create_task(channel.send(entry["timeout_message"]))
-			else:
-				active.append(entry)
-
-		self.awaiting_reactions = active
-
-		# ------------------------------
-		#  Static Reaction timeouts
-		# ------------------------------
-		active = []
-		for entry in self.static_reactions:
-			timeout_datetime = datetime.datetime.fromisoformat(entry["timeout_datetime"])
-			if now >= timeout_datetime:
-				reactions = GetConfig("response_reactions", guild_id=entry["guild_id"]).value()
-				if reactions is None:
-					reactions = []
-				reactions = [r for r in reactions if r["message_id"] != entry["message_id"]]
-				
-				SetConfig("response_reactions", reactions, guild_id=entry["guild_id"])
-
-				channel = client.get_channel(entry["channel_id"])
-				if channel:
-					print(f"\033[33m[Cleanup]\033[36m [Response]\033[0m {entry["timeout_message"]}")
-					asyncio.create_task(channel.send(entry["timeout_message"]))
-			else:
-				active.append(entry)
-
-		self.static_reactions = active
\ No newline at end of file
+			- Pops every deadline that has passed from the heap.
+			- If the entry is still waiting, remove it and notify the channel
+			  with timeout_message, or fail its future with asyncio.TimeoutError.
+			- Active entries are not touched.
+		"""
+		now = time.time()
+
+		# Everything is unregistered before awaiting any config I/O, so
+		# reactions registered in the meantime are not affected.
+		expired = []
+		while self.deadlines and self.deadlines[0][0] <= now:
+			_, _, entry = heapq.heappop(self.deadlines)
+			if self._unregister(entry):
+				expired.append(entry)
+
+		for entry in expired:
+			if entry.future is not None:
+				if not entry.future.done():
+					entry.future.set_exception(asyncio.TimeoutError())
+				continue
+
+			if isinstance(entry, StaticReaction):
+				message_id = entry.message_id
+				await aremove_config("response_reactions", lambda r: r["message_id"] == message_id, guild_id=entry.guild_id)
+
+			channel = client.get_channel(entry.channel_id)
+			if channel:
+				print(f"\033[33m[Cleanup]\033[36m [Response]\033[0m {entry.timeout_message}")
+				asyncio.create_task(channel.send(entry.timeout_message))
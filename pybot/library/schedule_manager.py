@@ -1,29 +1,502 @@
 """
 File: schedule_manager.py
 Maintainer: Vintage Warhawk
-Last Edit: 2025-11-21
+Last Edit: 2026-10-16
+
+Description:
+Registry of schedules and the scheduler that fires them. The next fire time of
+every schedule is kept in one min-heap of absolute deadlines, and a single loop
+sleeps until the earliest one, so the number of coroutines and wakeups does not
+grow with the number of schedules. The next deadline is computed from the
+previous deadline rather than from the time the loop woke up, so schedules do
+not drift.
+
+Schedules can be cron expressions, fixed intervals, or objects with an async
+get(client) method returning the seconds until the next run.
+
+Guild schedules (register_guild_cron) fire once per guild, in the timezone stored
+in that guild's config. Every guild instance is one entry in the same heap. With
+a spread window, each guild runs at a fixed offset into the window derived from a
+hash of its id, so a tick does not start every guild's work at the same instant.
 """
 
+import asyncio
+import heapq
+import itertools
+import time
+import traceback
+import zlib
+
+import pytz
+
+from library import config_manager
+from library.cron import CronExpression
+
+
+def _timezone(name):
+	"""
+	Return the pytz timezone for a name, or None if it is unknown.
+	"""
+	try:
+		return pytz.timezone(name)
+	except pytz.UnknownTimeZoneError:
+		return None
+
+
+class CronSchedule:
+	"""
+	Schedule firing whenever a cron expression matches.
+
+	Attributes:
+		cron (CronExpression): The parsed expression.
+		timezone (pytz timezone | str | None): Zone the expression is evaluated in. UTC if None.
+	"""
+
+	def __init__(self, expression: str, timezone=None):
+		"""
+		Args:
+			expression (str): e.g. "0 12 * * *". See library/cron.py.
+			timezone (pytz timezone | str, optional): e.g. "America/Chicago".
+		"""
+		self.cron = CronExpression(expression)
+		self.timezone = timezone
+
+	def next_after(self, after: float) -> float:
+		"""
+		Returns:
+			float: Epoch seconds of the first fire time after "after".
+		"""
+		return self.cron.next_after(after, self.timezone)
+
+
+class GuildCronSchedule(CronSchedule):
+	"""
+	Cron schedule with one instance per guild, evaluated in the guild's timezone.
+
+	Attributes:
+		timezone_key (str): Config key holding a guild's timezone name.
+		timezone (str): Timezone of guilds without (or with an invalid) setting.
+		spread (float): Seconds after each tick over which the guilds' runs are spread.
+	"""
+
+	# next_after() results kept per (timezone, after); guilds in one timezone share them.
+	MEMO_SIZE = 4096
+
+	def __init__(self, expression: str, timezone_key="timezone", default_timezone="UTC", spread=0):
+		"""
+		Args:
+			expression (str): e.g. "0 12 * * *". See library/cron.py.
+			timezone_key (str): Config key of the per-guild timezone.
+			default_timezone (str): e.g. "America/Chicago".
+			spread (float): Window in seconds, shorter than the time between ticks.
+		"""
+		if _timezone(default_timezone) is None:
+			raise ValueError(f"Unknown timezone: {default_timezone!r}")
+		if spread < 0:
+			raise ValueError(f"Schedule spread must not be negative, got {spread}")
+		super().__init__(expression, default_timezone)
+		self.timezone_key = timezone_key
+		self.spread = spread
+		self.memo = {}
+
+	def offset(self, guild_id: int) -> float:
+		"""
+		Returns:
+			float: The guild's fixed delay after each tick, in [0, spread).
+				The same on every restart, so a guild keeps its slot.
+		"""
+		if not self.spread:
+			return 0.0
+		return zlib.crc32(str(guild_id).encode()) % max(1, int(self.spread * 1000)) / 1000
+
+	def next_after_in(self, after: float, timezone) -> float:
+		"""
+		Returns:
+			float: Epoch seconds of the first fire time after "after" in a timezone.
+		"""
+		key = (timezone.zone, after)
+		deadline = self.memo.get(key)
+		if deadline is None:
+			if len(self.memo) >= self.MEMO_SIZE:
+				self.memo.clear()
+			deadline = self.memo[key] = self.cron.next_after(after, timezone)
+		return deadline
+
+
+class IntervalSchedule:
+	"""
+	Schedule firing every fixed number of seconds, aligned to its first deadline.
+
+	Attributes:
+		seconds (float): Interval length.
+	"""
+
+	def __init__(self, seconds: float):
+		"""
+		Args:
+			seconds (float | datetime.timedelta): Interval length.
+		"""
+		if hasattr(seconds, "total_seconds"):
+			seconds = seconds.total_seconds()
+		if seconds <= 0:
+			raise ValueError(f"Schedule interval must be positive, got {seconds}")
+		self.seconds = seconds
+
+	def next_after(self, after: float) -> float:
+		"""
+		Returns:
+			float: "after" plus one interval.
+		"""
+		return after + self.seconds
+
+
 class ScheduleManager:
 	"""
 	Manages schedules for tasks grouped by interval.
 
 	Attributes:
-		schedules (list): A list of schedule hooks.
+		schedules (dict): Interval name -> schedule.
+		deadlines (list): Heap of (deadline, sequence, key, fire). The key is the
+			interval name, or (interval name, guild id) for guild schedules.
+		guilds (set): Guild ids guild schedules run for.
 	"""
 
+	# Upper bound for one sleep of the scheduler loop (seconds).
+	MAX_SLEEP = 3600
+
+	# Minimum seconds between two runs of a get()-style schedule.
+	MIN_GAP = 1
+
 	def __init__(self):
 		"""
 		Initialize the ScheduleManager with an empty schedule list.
 		"""
 		self.schedules = {}
+		self.deadlines = []
+		self.current = {}			# key -> sequence of its live heap entry
+		self.last_fired = {}		# interval name -> epoch of its last run
+		self.guilds = set()
+		self.timezones = {}			# (timezone key, guild id) -> pytz timezone
+		self.watched = set()		# timezone keys loaded from config and subscribed to
+		self.sequence = itertools.count()
+		self.wakeup = asyncio.Event()
+		self.running = False
+		self.client = None
 
-	def register_schedule(self, interval_name: str, schedule ):
+	def register_schedule(self, interval_name: str, schedule):
 		"""
 		Register a schedule calling all tasks on that interval.
+		Replaces an earlier schedule of the same name.
 
 		Args:
 			interval_name (str): e.g., "hourly", "daily"
-			schedule: class
+			schedule: CronSchedule, IntervalSchedule, or an object with
+				async get(client) returning the seconds until the next run.
+		"""
+		self.unregister_schedule(interval_name)
+		self.schedules[interval_name] = schedule
+		if not self.running:
+			return
+
+		if isinstance(schedule, GuildCronSchedule):
+			asyncio.ensure_future(self._plan_guild_schedule(interval_name))
+		else:
+			asyncio.ensure_future(self._plan(interval_name, time.time()))
+
+	def register_cron(self, interval_name: str, expression: str, timezone=None):
+		"""
+		Register a schedule firing on a cron expression.
+
+		Args:
+			interval_name (str): e.g., "noon"
+			expression (str): e.g., "0 12 * * *"
+			timezone (pytz timezone | str, optional): Zone of the expression. UTC if None.
+		"""
+		self.register_schedule(interval_name, CronSchedule(expression, timezone))
+
+	def register_guild_cron(self, interval_name: str, expression: str, timezone_key="timezone", default_timezone="UTC", spread=0):
+		"""
+		Register a cron schedule that fires separately for every guild, in the
+		timezone stored under timezone_key in the guild's config. Its tasks are
+		run as task.run(client, guild).
+
+		Args:
+			interval_name (str): e.g., "noon"
+			expression (str): e.g., "0 12 * * *"
+			timezone_key (str): Config key of the per-guild timezone, e.g. "Europe/Berlin".
+			default_timezone (str): Timezone of guilds without a setting.
+			spread (float): Seconds after each tick over which the guilds' runs are
+				spread; 0 runs every guild at the tick.
+		"""
+		self.register_schedule(interval_name, GuildCronSchedule(expression, timezone_key, default_timezone, spread))
+
+	def register_interval(self, interval_name: str, seconds: float):
+		"""
+		Register a schedule firing every number of seconds.
+
+		Args:
+			interval_name (str): e.g., "every_5_minutes"
+			seconds (float | datetime.timedelta): Interval length.
+		"""
+		self.register_schedule(interval_name, IntervalSchedule(seconds))
+
+	def unregister_schedule(self, interval_name: str):
+		"""
+		Remove a schedule. Its pending heap entry is skipped when it comes due.
+		"""
+		schedule = self.schedules.pop(interval_name, None)
+		self.current.pop(interval_name, None)
+		self.last_fired.pop(interval_name, None)
+		if isinstance(schedule, GuildCronSchedule):
+			for guild_id in self.guilds:
+				self.current.pop((interval_name, guild_id), None)
+
+	def next_run(self, interval_name: str, guild_id: int = None):
+		"""
+		Returns:
+			float | None: Epoch seconds of the schedule's next run (for a guild), if planned.
+		"""
+		sequence = self.current.get(interval_name if guild_id is None else (interval_name, guild_id))
+		for deadline, entry_sequence, _, fire in self.deadlines:
+			if entry_sequence == sequence and fire:
+				return deadline
+		return None
+
+	# ======================================================================
+	#  Guild Schedules
+	# ======================================================================
+
+	def _guild_schedules(self):
+		"""
+		Yield (interval name, schedule) of every guild schedule.
+		"""
+		for interval_name, schedule in self.schedules.items():
+			if isinstance(schedule, GuildCronSchedule):
+				yield interval_name, schedule
+
+	def _guild_timezone(self, schedule, guild_id):
+		"""
+		Return the timezone a guild schedule is evaluated in for a guild.
+		"""
+		timezone = self.timezones.get((schedule.timezone_key, guild_id))
+		if timezone is None:
+			timezone = _timezone(schedule.timezone)
+		return timezone
+
+	def _plan_guild(self, interval_name, guild_id, after):
+		"""
+		Push the next deadline of one guild's instance of a guild schedule.
+		"""
+		schedule = self.schedules[interval_name]
+		key = (interval_name, guild_id)
+		sequence = next(self.sequence)
+		self.current[key] = sequence
+
+		# Ticks are evaluated without the guild's offset, on whole minutes (cron's
+		# resolution), so guilds sharing a timezone share the memoized result.
+		timezone = self._guild_timezone(schedule, guild_id)
+		offset = schedule.offset(guild_id)
+		tick_after = after - offset + 0.5
+		deadline = schedule.next_after_in(tick_after - tick_after % 60, timezone) + offset
+		now = time.time()
+		if deadline <= now:
+			# Fell behind, skip missed runs.
+			deadline = schedule.next_after_in(now - now % 60, timezone) + offset
+
+		heapq.heappush(self.deadlines, (deadline, sequence, key, True))
+		if self.deadlines[0][1] == sequence:
+			self.wakeup.set()
+
+	async def _load_timezones(self, timezone_key):
+		"""
+		Read every guild's timezone setting for a key and watch it for changes.
+		"""
+		if timezone_key in self.watched:
+			return
+		self.watched.add(timezone_key)
+		config_manager.subscribe(timezone_key, self._timezone_changed)
+		for guild_id, name in (await config_manager.aget_config_all(timezone_key)).items():
+			self._set_timezone(timezone_key, int(guild_id), name)
+
+	def _set_timezone(self, timezone_key, guild_id, name):
+		"""
+		Store a guild's timezone setting. Unknown names fall back to the default.
+		"""
+		timezone = _timezone(name) if isinstance(name, str) else None
+		if timezone is None:
+			self.timezones.pop((timezone_key, guild_id), None)
+			if name is not None:
+				print(f"\033[33m[Schedule]\033[31m [{guild_id}]\033[0m Unknown timezone {name!r}, using the default")
+		else:
+			self.timezones[(timezone_key, guild_id)] = timezone
+
+	def _timezone_changed(self, timezone_key, guild_id, value):
+		"""
+		Config subscriber: replan a guild's schedules when its timezone changes.
+		"""
+		if guild_id is None:
+			return
+		guild_id = int(guild_id)
+		self._set_timezone(timezone_key, guild_id, value)
+		if not self.running or guild_id not in self.guilds:
+			return
+
+		now = time.time()
+		for interval_name, schedule in self._guild_schedules():
+			if schedule.timezone_key == timezone_key:
+				self._plan_guild(interval_name, guild_id, now)
+
+	async def _plan_guild_schedule(self, interval_name):
+		"""
+		Plan a newly registered guild schedule for every guild.
+		"""
+		await self._load_timezones(self.schedules[interval_name].timezone_key)
+		if interval_name in self.schedules:
+			now = time.time()
+			for guild_id in self.guilds:
+				self._plan_guild(interval_name, guild_id, now)
+
+	def add_guild(self, guild_id: int):
+		"""
+		Start the guild schedules for a guild, e.g. when the bot joins it.
+		"""
+		guild_id = int(guild_id)
+		if guild_id in self.guilds:
+			return
+		self.guilds.add(guild_id)
+		if self.running:
+			now = time.time()
+			for interval_name, _ in self._guild_schedules():
+				self._plan_guild(interval_name, guild_id, now)
+
+	def remove_guild(self, guild_id: int):
+		"""
+		Stop the guild schedules for a guild. Its heap entries are skipped when due.
+		"""
+		guild_id = int(guild_id)
+		self.guilds.discard(guild_id)
+		for interval_name, _ in self._guild_schedules():
+			self.current.pop((interval_name, guild_id), None)
+
+	async def _next_deadline(self, interval_name, after, now):
+		"""
+		Ask a schedule for its first deadline after "after" (epoch seconds).
+
+		Returns:
+			tuple: (deadline, fire). fire is False when the schedule has to be
+			asked again at the deadline instead of being run.
+		"""
+		schedule = self.schedules[interval_name]
+		if hasattr(schedule, "next_after"):
+			deadline = schedule.next_after(after)
+			if deadline <= now:
+				deadline = schedule.next_after(now)		# fell behind, skip missed runs
+			return deadline, True
+
+		# get()-style schedule: seconds from now. When the loop wakes a moment
+		# before the boundary it just fired for, get() points at that boundary
+		# again; ask again once it has passed.
+		deadline = now + await schedule.get(self.client)
+		last = self.last_fired.get(interval_name)
+		if last is not None and deadline < last + self.MIN_GAP:
+			return last + self.MIN_GAP, False
+		return deadline, True
+
+	async def _plan(self, interval_name, after):
+		"""
+		Compute a schedule's next deadline and push it on the heap.
+		"""
+		if interval_name not in self.schedules:
+			return
+		sequence = next(self.sequence)
+		self.current[interval_name] = sequence
+		try:
+			deadline, fire = await self._next_deadline(interval_name, after, time.time())
+		except Exception as e:
+			print(f"\033[33m[Schedule]\033[31m [{interval_name}]\033[0m Failed to compute next run: \033[31m{e!r}\033[0m")
+			traceback.print_exception(e)
+			deadline, fire = time.time() + 60, False
+
+		if self.current.get(interval_name) != sequence:
+			return		# replaced or removed meanwhile
+		heapq.heappush(self.deadlines, (deadline, sequence, interval_name, fire))
+		if self.deadlines[0][1] == sequence:
+			self.wakeup.set()
+
+	async def run(self, client, fire):
+		"""
+		Fire schedules as their deadlines come due. Runs until cancelled.
+
+		Args:
+			client (discord.Client): Passed to get()-style schedules. Its guilds
+				are added to the guild schedules.
+			fire (callable): fire(interval_name, guild_id), called once per due
+				schedule; guild_id is None except for guild schedules.
+
+		Behavior:
+			- Sleeps until the earliest deadline, or until an earlier one is registered.
+			- A schedule that fell behind (e.g. the host was suspended) fires once
+			  and continues with its next deadline after the current time.
+		"""
+		if self.running:
+			print("\033[33m[Schedule]\033[31m Scheduler is already running\033[0m")
+			return
+
+		self.client = client
+		self.running = True
+		try:
+			for guild in getattr(client, "guilds", ()):
+				self.guilds.add(guild.id)
+
+			now = time.time()
+			for interval_name in list(self.schedules):
+				if isinstance(self.schedules[interval_name], GuildCronSchedule):
+					await self._plan_guild_schedule(interval_name)
+				else:
+					await self._plan(interval_name, now)
+
+			while True:
+				now = time.time()
+				while self.deadlines and self.deadlines[0][0] <= now:
+					deadline, sequence, key, runnable = heapq.heappop(self.deadlines)
+					if self.current.get(key) != sequence:
+						continue	# stale entry of a replaced or removed schedule
+
+					if isinstance(key, tuple):
+						interval_name, guild_id = key
+						self._fire(fire, interval_name, guild_id)
+						self._plan_guild(interval_name, guild_id, deadline)
+						continue
+
+					interval_name = key
+					if not runnable:
+						await self._plan(interval_name, deadline)
+						continue
+
+					self.last_fired[interval_name] = now
+					self._fire(fire, interval_name, None)
+
+					# Next deadline follows the previous one, skipping any that already passed.
+					await self._plan(interval_name, deadline)
+
+				self.wakeup.clear()
+				delay = self.MAX_SLEEP
+				if self.deadlines:
+					delay = min(delay, max(0, self.deadlines[0][0] - time.time()))
+
+				try:
+					await asyncio.wait_for(self.wakeup.wait(), delay)
+				except asyncio.TimeoutError:
+					pass
+		finally:
+			self.running = False
+
+	def _fire(self, fire, interval_name, guild_id):
+		"""
+		Call the fire callback, logging its exceptions.
 		"""
-		self.schedules[interval_name] = schedule
\ No newline at end of file
+		try:
+			fire(interval_name, guild_id)
+		except Exception as e:
+			print(f"\033[33m[Schedule]\033[31m [{interval_name}]\033[0m Firing failed: \033[31m{e!r}\033[0m")
+			traceback.print_exception(e)
@@ -1,24 +1,156 @@
 """
 File: tasks_manager.py
 Maintainer: Vintage Warhawk
-Last Edit: 2025-11-21
+Last Edit: 2026-10-16
+
+Description:
+Registry of tasks grouped by interval or event name, and the supervisor that runs
+them. Every run goes through submit(): runs of one event are limited to a number
+of concurrent tasks and queued beyond that, exceptions are logged instead of being
+lost in a detached asyncio task, run counts and latencies are recorded per task,
+and drain() waits for (then cancels) whatever is still running at shutdown.
+
+Event tasks can declare which events they care about (guilds, channels, content
+prefix or pattern, attachments). The filters are compiled into a per-guild index
+when the task is registered, so events only schedule tasks that match them.
+
+Each task can also declare an overlap policy (skip a run while one is in flight,
+queue one follow-up run, or allow N concurrent runs) and a hard timeout.
+
+Tasks doing blocking or CPU-heavy work can declare executor="thread" or "process".
+Their synchronous work() then runs in a pool owned by the manager, while the parts
+that talk to Discord (prepare() and deliver()) stay on the event loop.
 """
 
+import asyncio
+import multiprocessing
+import re
+import time
+import traceback
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+OVERLAP_POLICIES = ("allow", "skip", "queue")
+EXECUTORS = ("thread", "process")
+
+# Durations kept per task for the percentiles in get_stats().
+DURATION_SAMPLES = 256
+
+
+@dataclass(slots=True, eq=False)
+class TaskFilter:
+	"""
+	Compiled event filter of a registered task. None means "any".
+
+	Guild filters are applied by the index; the rest are checked per event.
+	"""
+	guilds: frozenset = None
+	channels: frozenset = None
+	prefixes: tuple = None
+	pattern: re.Pattern = None
+	attachments: bool = False
+
+	def empty(self):
+		"""
+		True if the filter accepts every event.
+		"""
+		return (self.guilds is None and self.channels is None and self.prefixes is None
+				and self.pattern is None and not self.attachments)
+
+	def accepts(self, target):
+		"""
+		Check the channel and content filters against an event's target
+		(a discord.Message or discord.Member).
+		"""
+		if self.channels is not None:
+			channel = getattr(target, "channel", None)
+			if channel is None or channel.id not in self.channels:
+				return False
+
+		if self.attachments and not getattr(target, "attachments", None):
+			return False
+
+		if self.prefixes is not None or self.pattern is not None:
+			content = getattr(target, "content", None)
+			if not content:
+				return False
+			if self.prefixes is not None and not content.startswith(self.prefixes):
+				return False
+			if self.pattern is not None and self.pattern.search(content) is None:
+				return False
+
+		return True
+
+
+@dataclass(slots=True, eq=False)
+class TaskPolicy:
+	"""
+	Execution policy of a registered task.
+
+	Attributes:
+		overlap (str): What to do with a run while max_runs runs are in flight:
+			"allow" / "skip" drop it, "queue" keeps one to start afterwards.
+		max_runs (int): Runs in flight at once, None for no limit. 1 for "skip" and "queue".
+		timeout (float): Seconds after which a run is cancelled, None for no limit.
+		executor (str): "thread" or "process" to run work() in a pool, None to run on the loop.
+	"""
+	overlap: str = "allow"
+	max_runs: int = None
+	timeout: float = None
+	executor: str = None
+
+
+def _percentile(samples, fraction):
+	"""
+	Nearest-rank percentile of a sorted list.
+	"""
+	if not samples:
+		return 0.0
+	return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
 class TaskManager:
 	"""
 	Manages scheduled tasks grouped by interval.
 
 	Attributes:
 		tasks (dict): A dictionary mapping interval names to lists of task instances.
+		limits (dict): Concurrent runs allowed per interval name; default_limit otherwise.
+		max_queued (int): Runs queued per interval name before new ones are dropped.
 	"""
 
-	def __init__(self):
+	def __init__(self, default_limit=10, max_queued=1000, thread_workers=4, process_workers=2):
 		"""
 		Initialize the TaskManager with an empty task dictionary.
+
+		Args:
+			default_limit (int): Concurrent runs allowed per interval name.
+			max_queued (int): Runs waiting per interval name before new ones are dropped.
+			thread_workers (int): Size of the pool for executor="thread" tasks.
+			process_workers (int): Size of the pool for executor="process" tasks.
 		"""
 		self.tasks = {}
+		self.index = {}			# interval name -> {"any": [...], "guilds": {guild_id: [...]}}
+
+		self.default_limit = default_limit
+		self.max_queued = max_queued
+		self.limits = {}
+		self.running = {}		# interval name -> set of asyncio.Task
+		self.queues = {}		# interval name -> deque of (name, task, args, key)
+		self.stats = {}			# (interval name, task name) -> run statistics
+		self.policies = {}		# (interval name, task name) -> TaskPolicy
+		self.in_flight = {}		# (interval name, task name, key) -> running or queued runs
+		self.follow_up = {}		# (interval name, task name, key) -> (task, args) of a queued overlap
+		self.draining = False
+
+		self.executor_sizes = {"thread": thread_workers, "process": process_workers}
+		self.executors = {}		# "thread" / "process" -> executor, created on first use
 
-	def register_task(self, interval_name: str, name: str, task):
+	def register_task(self, interval_name: str, name: str, task, *, guilds=None, channels=None,
+					  prefix=None, pattern=None, attachments=False, overlap="allow", max_runs=None, timeout=None,
+					  executor=None):
 		"""
 		Register a task under a specific interval.
 
@@ -26,8 +158,71 @@ class TaskManager:
 			interval_name (str): e.g., "hourly", "daily"
 			name (str): task name for logs and identification
 			task: instance with async run(client)
+
+		Execution policy (optional):
+			overlap (str): "allow" (default) runs up to max_runs at once and drops
+				the rest, "skip" drops a run while the previous one is in flight,
+				"queue" keeps one run to start when the previous one finishes.
+				Runs submitted with a key (e.g. a guild id) only overlap with
+				runs of the same key.
+			max_runs (int): Concurrent runs for "allow". None for no limit.
+			timeout (float): Seconds after which a run is cancelled. Work already
+				running in an executor is abandoned, not interrupted.
+			executor (str): "thread" or "process". The task then provides a
+				synchronous work(*data) instead of run(), optionally with
+				async prepare(*args) returning work()'s arguments (a tuple or
+				a single value; default: args) and
+				async deliver(*args, result) to use the result on the loop.
+				For "process", work() and data must be picklable, so prepare()
+				should turn Discord objects into plain values.
+
+		Filters for event tasks (all optional, all must match):
+			guilds (iterable of int): Only events from these guilds.
+			channels (iterable of int): Only events from these channels.
+			prefix (str | tuple of str): Only messages starting with the prefix.
+			pattern (str | re.Pattern): Only messages the regex matches (re.search).
+			attachments (bool): Only messages with attachments.
 		"""
+		if overlap not in OVERLAP_POLICIES:
+			raise ValueError(f"Unknown overlap policy {overlap!r}, expected one of {OVERLAP_POLICIES}")
+		if executor is not None and executor not in EXECUTORS:
+			raise ValueError(f"Unknown executor {executor!r}, expected one of {EXECUTORS}")
+		if executor is not None and not callable(getattr(task, "work", None)):
+			raise ValueError(f"Task {name} uses executor={executor!r} but has no work() method")
 		self.tasks.setdefault(interval_name, {})[name] = task
+		self.policies[(interval_name, name)] = TaskPolicy(
+			overlap=overlap,
+			max_runs=max_runs if overlap == "allow" else 1,
+			timeout=timeout,
+			executor=executor,
+		)
+
+		task_filter = TaskFilter(
+			guilds=frozenset(int(guild) for guild in guilds) if guilds is not None else None,
+			channels=frozenset(int(channel) for channel in channels) if channels is not None else None,
+			prefixes=(prefix,) if isinstance(prefix, str) else tuple(prefix) if prefix is not None else None,
+			pattern=re.compile(pattern) if isinstance(pattern, str) else pattern,
+			attachments=attachments,
+		)
+		self._index(interval_name, name, task, task_filter)
+
+	def _index(self, interval_name, name, task, task_filter):
+		"""
+		Add a task to the dispatch index of its interval, replacing an
+		earlier registration of the same name.
+		"""
+		index = self.index.setdefault(interval_name, {"any": [], "guilds": {}})
+
+		index["any"] = [entry for entry in index["any"] if entry[0] != name]
+		for guild_id, entries in list(index["guilds"].items()):
+			index["guilds"][guild_id] = [entry for entry in entries if entry[0] != name]
+
+		entry = (name, task, task_filter)
+		if task_filter.guilds is None:
+			index["any"].append(entry)
+		else:
+			for guild_id in task_filter.guilds:
+				index["guilds"].setdefault(guild_id, []).append(entry)
 
 	def get_tasks(self, interval_name: str):
 		"""
@@ -40,3 +235,329 @@ class TaskManager:
 			dict: {task_name: task_instance}
 		"""
 		return self.tasks.get(interval_name, {})
+
+	# ======================================================================
+	#  Supervised Execution
+	# ======================================================================
+
+	def set_limit(self, limit: int, interval_name: str = None):
+		"""
+		Set the number of concurrent runs for one interval, or the default.
+
+		Args:
+			limit (int): Maximum concurrent runs.
+			interval_name (str, optional): Interval to limit. None changes the default.
+		"""
+		if interval_name is None:
+			self.default_limit = limit
+		else:
+			self.limits[interval_name] = limit
+
+	def match(self, interval_name: str, target=None):
+		"""
+		Return the tasks of an interval whose filters accept an event.
+
+		Args:
+			interval_name (str): e.g., "on_message"
+			target: The event's discord.Message or discord.Member, or None for
+				scheduled runs (only unfiltered tasks match).
+
+		Returns:
+			list: [(task_name, task_instance)]
+		"""
+		index = self.index.get(interval_name)
+		if index is None:
+			return []
+
+		guild = getattr(target, "guild", None)
+		candidates = index["any"]
+		if guild is not None and guild.id in index["guilds"]:
+			candidates = candidates + index["guilds"][guild.id]
+
+		matched = []
+		for name, task, task_filter in candidates:
+			if target is None:
+				if not task_filter.empty():
+					continue
+			elif not task_filter.accepts(target):
+				continue
+			matched.append((name, task))
+		return matched
+
+	def wants(self, interval_name: str, guild_id=None, channel_id=None):
+		"""
+		Cheap check whether an event from a guild and channel could match any
+		task of the interval, before its message is fetched. Content filters
+		are not checked.
+
+		Returns:
+			bool
+		"""
+		index = self.index.get(interval_name)
+		if index is None:
+			return False
+
+		for entries in (index["any"], index["guilds"].get(guild_id, ())):
+			for _, _, task_filter in entries:
+				if task_filter.channels is None or channel_id in task_filter.channels:
+					return True
+		return False
+
+	def run_tasks(self, interval_name: str, *args, target=None):
+		"""
+		Submit every task registered under an interval whose filters accept the event.
+
+		Args:
+			interval_name (str): e.g., "on_message"
+			*args: Arguments passed to each task's run().
+			target: Object the filters are checked against, see match().
+		"""
+		for name, task in self.match(interval_name, target):
+			self.submit(interval_name, name, task, *args)
+
+	def submit(self, interval_name: str, name: str, task, *args, key=None):
+		"""
+		Run task.run(*args) under supervision, or queue it if the interval is
+		at its concurrency limit. Must be called from the event loop.
+
+		Args:
+			key: Overlap scope, e.g. the guild of a per-guild run. See register_task().
+
+		Returns:
+			bool: False if the run was dropped (overlap, queue full or shutting down).
+		"""
+		if self.draining:
+			return False
+
+		policy = self.policies.get((interval_name, name))
+		if policy is not None and policy.max_runs is not None:
+			slot = (interval_name, name, key)
+			if self.in_flight.get(slot, 0) >= policy.max_runs:
+				self._stats(interval_name, name)["overruns"] += 1
+				if policy.overlap == "queue":
+					self.follow_up[slot] = (task, args)
+					return True
+				print(f"\033[33m[Task]\033[31m [{interval_name}]\033[0m {name} is still running, skipped a run")
+				return False
+			self.in_flight[slot] = self.in_flight.get(slot, 0) + 1
+
+		running = self.running.setdefault(interval_name, set())
+		if len(running) < self.limits.get(interval_name, self.default_limit):
+			self._start(interval_name, name, task, args, key)
+			return True
+
+		queue = self.queues.setdefault(interval_name, deque())
+		if len(queue) >= self.max_queued:
+			self._stats(interval_name, name)["dropped"] += 1
+			self._release(interval_name, name, key)
+			print(f"\033[33m[Task]\033[31m [{interval_name}]\033[0m Queue full, dropped run of {name}")
+			return False
+
+		queue.append((name, task, args, key))
+		return True
+
+	def _start(self, interval_name, name, task, args, key):
+		"""
+		Create the asyncio task for one run and track it.
+		"""
+		run = asyncio.create_task(self._run(interval_name, name, task, args, key), name=f"{interval_name}:{name}")
+		self.running[interval_name].add(run)
+		run.add_done_callback(lambda done: self._finished(interval_name, done))
+
+	def _finished(self, interval_name, run):
+		"""
+		Forget a finished run and start the next queued one.
+		"""
+		self.running[interval_name].discard(run)
+
+		queue = self.queues.get(interval_name)
+		if queue and not self.draining:
+			name, task, args, key = queue.popleft()
+			self._start(interval_name, name, task, args, key)
+
+	def _release(self, interval_name, name, key):
+		"""
+		Mark a run of an overlap-limited task as no longer in flight, and
+		submit the follow-up run queued behind it, if any.
+		"""
+		slot = (interval_name, name, key)
+		count = self.in_flight.get(slot)
+		if count is None:
+			return
+		if count > 1:
+			self.in_flight[slot] = count - 1
+		else:
+			del self.in_flight[slot]
+
+		follow_up = self.follow_up.pop(slot, None)
+		if follow_up is not None and not self.draining:
+			task, args = follow_up
+			self.submit(interval_name, name, task, *args, key=key)
+
+	async def _run(self, interval_name, name, task, args, key):
+		"""
+		Await one run, logging exceptions and recording its latency.
+		"""
+		stats = self._stats(interval_name, name)
+		policy = self.policies.get((interval_name, name))
+		timeout = asyncio.timeout(policy.timeout if policy is not None else None)
+		start = time.perf_counter()
+		try:
+			async with timeout:
+				if policy is not None and policy.executor is not None:
+					await self._run_in_executor(policy.executor, task, args)
+				else:
+					await task.run(*args)
+		except asyncio.CancelledError:
+			stats["cancelled"] += 1
+			raise
+		except TimeoutError as e:
+			# Only the policy's own timeout counts; a TimeoutError raised by the task is a failure.
+			if not timeout.expired():
+				stats["failures"] += 1
+				print(f"\033[33m[Task]\033[31m [{interval_name}]\033[0m {name} failed: \033[31m{e!r}\033[0m")
+				traceback.print_exception(e)
+			else:
+				stats["timeouts"] += 1
+				print(f"\033[33m[Task]\033[31m [{interval_name}]\033[0m {name} timed out after {policy.timeout}s")
+		except Exception as e:
+			stats["failures"] += 1
+			print(f"\033[33m[Task]\033[31m [{interval_name}]\033[0m {name} failed: \033[31m{e!r}\033[0m")
+			traceback.print_exception(e)
+		finally:
+			elapsed = time.perf_counter() - start
+			stats["runs"] += 1
+			stats["total_time"] += elapsed
+			stats["max_time"] = max(stats["max_time"], elapsed)
+			stats["last_time"] = elapsed
+			stats["durations"].append(elapsed)
+			self._release(interval_name, name, key)
+
+	# ======================================================================
+	#  Executors
+	# ======================================================================
+
+	def set_executor_size(self, executor: str, workers: int):
+		"""
+		Set the number of workers of the thread or process pool. Takes effect
+		when the pool is created, i.e. before the first run using it.
+
+		Args:
+			executor (str): "thread" or "process".
+			workers (int): Pool size.
+		"""
+		self.executor_sizes[executor] = workers
+
+	def _executor(self, kind):
+		"""
+		Return the pool for an executor kind, creating it on first use.
+		"""
+		executor = self.executors.get(kind)
+		if executor is None:
+			if kind == "thread":
+				executor = ThreadPoolExecutor(max_workers=self.executor_sizes["thread"], thread_name_prefix="pybot-task")
+			else:
+				# Workers are not forked from the running bot (its threads and sockets).
+				method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+				executor = ProcessPoolExecutor(max_workers=self.executor_sizes["process"], mp_context=multiprocessing.get_context(method))
+			self.executors[kind] = executor
+		return executor
+
+	async def _run_in_executor(self, kind, task, args):
+		"""
+		Run an executor task: prepare() on the loop, work() in the pool,
+		deliver() back on the loop.
+		"""
+		data = args
+		if hasattr(task, "prepare"):
+			data = await task.prepare(*args)
+			if not isinstance(data, tuple):
+				data = (data,)
+
+		result = await asyncio.get_running_loop().run_in_executor(self._executor(kind), task.work, *data)
+
+		if hasattr(task, "deliver"):
+			await task.deliver(*args, result)
+		return result
+
+	def _stats(self, interval_name, name):
+		"""
+		Return the statistics record of a task, creating it on first use.
+		"""
+		key = (interval_name, name)
+		if key not in self.stats:
+			self.stats[key] = {"runs": 0, "failures": 0, "cancelled": 0, "dropped": 0, "overruns": 0, "timeouts": 0,
+							   "total_time": 0.0, "max_time": 0.0, "last_time": 0.0, "durations": deque(maxlen=DURATION_SAMPLES)}
+		return self.stats[key]
+
+	def get_stats(self):
+		"""
+		Return run statistics per task.
+
+		Returns:
+			dict: {"interval:name": {"runs", "failures", "timeouts", "cancelled",
+			"dropped", "overruns", "avg_time", "last_time", "p50_time", "p99_time",
+			"max_time", "running", "queued"}}. Percentiles cover the last
+			DURATION_SAMPLES runs; overruns counts runs skipped or queued by the
+			overlap policy.
+		"""
+		result = {}
+		for (interval_name, name), stats in self.stats.items():
+			durations = sorted(stats["durations"])
+			queued = sum(1 for entry in self.queues.get(interval_name, ()) if entry[0] == name)
+			running = sum(1 for run in self.running.get(interval_name, ()) if run.get_name() == f"{interval_name}:{name}")
+			result[f"{interval_name}:{name}"] = {
+				"runs": stats["runs"],
+				"failures": stats["failures"],
+				"timeouts": stats["timeouts"],
+				"cancelled": stats["cancelled"],
+				"dropped": stats["dropped"],
+				"overruns": stats["overruns"],
+				"avg_time": stats["total_time"] / stats["runs"] if stats["runs"] else 0.0,
+				"last_time": stats["last_time"],
+				"p50_time": _percentile(durations, 0.50),
+				"p99_time": _percentile(durations, 0.99),
+				"max_time": stats["max_time"],
+				"running": running,
+				"queued": queued,
+			}
+		return result
+
+	async def drain(self, timeout: float = 10):
+		"""
+		Stop accepting runs, drop queued ones, wait for running ones up to
+		timeout seconds and cancel whatever is left.
+
+		Args:
+			timeout (float): Seconds to wait for running tasks.
+
+		Returns:
+			tuple: (finished, cancelled) number of runs.
+		"""
+		self.draining = True
+
+		for interval_name, queue in self.queues.items():
+			for name, _, _, key in queue:
+				self._stats(interval_name, name)["dropped"] += 1
+				self._release(interval_name, name, key)
+			queue.clear()
+		self.follow_up.clear()
+
+		runs = set()
+		for running in self.running.values():
+			runs.update(running)
+
+		if runs:
+			done, pending = await asyncio.wait(runs, timeout=timeout)
+			for run in pending:
+				run.cancel()
+			if pending:
+				await asyncio.wait(pending)
+		else:
+			done, pending = (), ()
+
+		# Work already handed to a pool cannot be interrupted; don't wait for it.
+		for executor in self.executors.values():
+			executor.shutdown(wait=False, cancel_futures=True)
+		self.executors.clear()
+		return len(done), len(pending)
@@ -1,49 +1,30 @@
 """
-File: tasks.py
+File: schedules.py
 Maintainer: Vintage Warhawk
-Last Edit: 2025-11-25
+Last Edit: 2026-10-16
 """
 
-from datetime import datetime, timedelta
-import pytz
+from library.schedule_manager import ScheduleManager
 
-TIMEZONE = pytz.timezone("America/Chicago")
+TIMEZONE = "America/Chicago"
 
-from library.schedule_manager import ScheduleManager
-from library.config_manager import GetConfig
+# Seconds over which per-guild runs of one tick are spread, to avoid a burst
+# of config reads and Discord API calls for every guild at the same instant.
+SPREAD = 300
 
-# Create a ScheduleManager instance to register tasks
+# Create a ScheduleManager instance to register schedules
 manager = ScheduleManager()
 
 # -----------------------------
 # Example Schedule: Hourly
 # -----------------------------
-class HourlySchedule:
-	"""
-	Schedule that runs hooked tasks on the hour.
-	"""
-	async def get(self, client):
-		now = datetime.now(TIMEZONE).replace(microsecond=0)
-		next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
-		return (next_hour - now).total_seconds()
-
-# Register the hourly schedule
-manager.register_schedule("hourly", HourlySchedule())
+# Runs hooked tasks for each guild once an hour, spread over the first
+# SPREAD seconds of the hour.
+manager.register_guild_cron("hourly", "0 * * * *", "timezone", TIMEZONE, spread=SPREAD)
 
 # -----------------------------
 # Example Schedule: Noon
 # -----------------------------
-class NoonSchedule:
-	"""
-	Schedule that runs hooked tasks every day at noon.
-	"""
-	async def get(self, client):
-		now = datetime.now(TIMEZONE).replace(microsecond=0)
-		next_noon = now.replace(hour=12, minute=0, second=0, microsecond=0)
-		if now >= next_noon:
-			next_noon += timedelta(days=1)
-
-		return (next_noon - now).total_seconds()
-
-# Register the noon schedule
-manager.register_schedule("noon", NoonSchedule())
\ No newline at end of file
+# Runs hooked tasks for each guild every day at noon in the guild's timezone
+# (config key "timezone", e.g. "Europe/Berlin"), or in TIMEZONE if it has none.
+manager.register_guild_cron("noon", "0 12 * * *", "timezone", TIMEZONE, spread=SPREAD)
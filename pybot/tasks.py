@@ -1,13 +1,13 @@
 """
 File: tasks.py
 Maintainer: Vintage Warhawk
-Last Edit: 2025-11-30
+Last Edit: 2026-10-16
 """
 
 import discord
 
 from library.task_manager import TaskManager
-from library.config_manager import GetConfig
+from library.config_manager import aget_config
 
 # Create a TaskManager instance to register tasks
 manager = TaskManager()
@@ -22,7 +22,7 @@ class JoinTask:
 
 	async def run(self, client, member):
 
-		role_name = GetConfig("default_role", guild_id=member.guild.id).value()
+		role_name = await aget_config("default_role", guild_id=member.guild.id)
 		role = discord.utils.get(member.guild.roles, name=role_name)
 
 		if role != None:
@@ -37,52 +37,53 @@ manager.register_task("on_join", "Default Role", JoinTask())
 # -----------------------------
 class HourlyTask:
 	"""
-	Task that runs every hour.
-	Sends a message to the configured home channel for each guild.
+	Task that runs every hour, separately for every guild.
+	Sends a message to the configured home channel of the guild.
 	"""
 
-	async def run(self, client):
+	async def run(self, client, guild):
 		"""
-		Executes the hourly task for all guilds the bot is in.
+		Executes the hourly task for one guild.
 
 		Args:
-			client (discord.Client): The bot instance, used to access guilds and channels.
+			client (discord.Client): The bot instance.
+			guild (discord.Guild): The guild to run for.
 		"""
-		for guild in client.guilds:
-			home_channel_id = GetConfig("home_channels", guild_id=guild.id).value()
-			if home_channel_id:
-				channel = guild.get_channel(int(home_channel_id))
-				if channel:
-					await channel.send("Hourly task executed!")
+		home_channel_id = await aget_config("home_channels", guild_id=guild.id)
+		if home_channel_id:
+			channel = guild.get_channel(int(home_channel_id))
+			if channel:
+				await channel.send("Hourly task executed!")
 
 # Register the hourly task
-manager.register_task("hourly", "Example Task", HourlyTask())
+# Skips a guild's run if its previous one is still going; gives up after a minute.
+manager.register_task("hourly", "Example Task", HourlyTask(), overlap="skip", timeout=60)
 
 # -----------------------------
 # Example Task: Daily
 # -----------------------------
 class DailyTask:
 	"""
-	Task that runs daily (e.g., at noon).
-	Sends a message to the configured home channel for each guild.
+	Task that runs daily (e.g., at noon), separately for every guild.
+	Sends a message to the configured home channel of the guild.
 	"""
 
-	async def run(self, client):
+	async def run(self, client, guild):
 		"""
-		Executes the daily task for all guilds the bot is in.
+		Executes the daily task for one guild, at noon in that guild's timezone.
 
 		Args:
-			client (discord.Client): The bot instance, used to access guilds and channels.
+			client (discord.Client): The bot instance.
+			guild (discord.Guild): The guild whose noon it is.
 		"""
-		for guild in client.guilds:
-			home_channel_id = GetConfig("home_channels", guild_id=guild.id).value()
-			if home_channel_id:
-				channel = guild.get_channel(int(home_channel_id))
-				if channel:
-					await channel.send("Daily task executed!")
+		home_channel_id = await aget_config("home_channels", guild_id=guild.id)
+		if home_channel_id:
+			channel = guild.get_channel(int(home_channel_id))
+			if channel:
+				await channel.send("Daily task executed!")
 
 # Register the noon task
-manager.register_task("noon", "Example Task", DailyTask())
+manager.register_task("noon", "Example Task", DailyTask(), overlap="skip", timeout=60)
 
 # -----------------------------
 # Example Task: Test
@@ -94,7 +95,7 @@ manager.register_task("noon", "Example Task", DailyTask())
 #    """
 #    async def run(self, client):
 #        for guild in client.guilds:
-#            home_channel_id = GetConfig("home_channels", guild_id=guild.id).value()
+#            home_channel_id = await aget_config("home_channels", guild_id=guild.id)
 #            if home_channel_id:
 #                channel = guild.get_channel(int(home_channel_id))
 #                if channel:
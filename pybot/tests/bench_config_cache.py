@@ -0,0 +1,72 @@
+"""
+File: bench_config_cache.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Microbenchmark for the JSON backend's in-memory cache. Builds a data.json with
+10k guilds across three keys and compares GetConfig reads served from the cache
+with reads that parse the file again (the behavior before the cache existed).
+
+Run from the pybot directory:
+	python tests/bench_config_cache.py [guilds]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library import config_format
+from library import config_manager
+
+
+def build(path, guilds):
+	"""
+	Write a data.json with per-guild values for three keys.
+	"""
+	data = {
+		"welcome_channel": {str(guild): 100000 + guild for guild in range(guilds)},
+		"timezone": {str(guild): "America/Chicago" for guild in range(guilds)},
+		"autoroles": {str(guild): [{"message_id": guild, "roles": [["👍", "Member"]]}] for guild in range(guilds)},
+	}
+	with open(path, "wb") as f:
+		f.write(config_format.dumps(data, "json"))
+
+def timed(fn, rounds):
+	"""
+	Returns the mean seconds per call of fn over rounds calls.
+	"""
+	start = time.perf_counter()
+	for i in range(rounds):
+		fn(i)
+	return (time.perf_counter() - start) / rounds
+
+def main(guilds=10000):
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, "data.json")
+		build(path, guilds)
+		config_manager.set_backend(config_manager.JsonBackend(path))
+
+		def uncached(i):
+			config_manager.invalidate_cache()
+			config_manager.GetConfig("timezone", guild_id=i % guilds).value()
+
+		def cached(i):
+			config_manager.GetConfig("timezone", guild_id=i % guilds).value()
+
+		cold = timed(uncached, 20)
+		cached(0)
+		warm = timed(cached, 100000)
+
+		print(f"data.json: {guilds} guilds, {os.path.getsize(path) / 1e6:.2f} MB")
+		print(f"  uncached read  {cold * 1e3:9.2f} ms")
+		print(f"  cached read    {warm * 1e6:9.2f} us")
+		print(f"  speedup        {cold / warm:9.0f}x")
+		print(f"  counters       {config_manager.cache_stats()}")
+		config_manager.set_backend(None)
+
+if __name__ == "__main__":
+	main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,77 @@
+"""
+File: bench_config_format.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Startup benchmark for the config snapshot formats. Writes a synthetic dataset
+(50k guilds, three keys per guild) in every format of config_format.py and
+reports the file size, the time to write it and the cold load time of a
+JsonBackend reading it (best of 5).
+
+Run from the pybot directory:
+	python tests/bench_config_format.py [guilds]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library import config_format
+from library.config_manager import JsonBackend
+
+ROUNDS = 5
+
+
+def dataset(guilds):
+	"""
+	Returns synthetic config data with per-guild values for three keys.
+	"""
+	return {
+		"welcome_channel": {str(guild): 100000000000000000 + guild for guild in range(guilds)},
+		"timezone": {str(guild): "America/Chicago" for guild in range(guilds)},
+		"autoroles": {
+			str(guild): [{"message_id": 200000000000000000 + guild, "channel_id": 300000000000000000 + guild,
+						  "roles": [["👍", "Member"], ["🎮", "Gamer"]]}]
+			for guild in range(guilds)
+		},
+	}
+
+def best(fn):
+	"""
+	Returns the fastest of ROUNDS runs of fn in seconds.
+	"""
+	times = []
+	for _ in range(ROUNDS):
+		start = time.perf_counter()
+		fn()
+		times.append(time.perf_counter() - start)
+	return min(times)
+
+def main(guilds=50000):
+	data = dataset(guilds)
+	print(f"{guilds} guilds, three keys per guild, best of {ROUNDS}")
+	print(f"  {'format':8} {'size':>9} {'write':>9} {'load':>9}")
+
+	with tempfile.TemporaryDirectory() as directory:
+		for fmt in config_format.FORMATS:
+			path = os.path.join(directory, f"data.{fmt}")
+
+			def write():
+				with open(path, "wb") as f:
+					f.write(config_format.dumps(data, fmt))
+
+			def load():
+				# A new backend per round, so every load parses the file cold.
+				JsonBackend(path, fmt=fmt).read("timezone", "1")
+
+			write_time = best(write)
+			load_time = best(load)
+			size = os.path.getsize(path)
+			print(f"  {fmt:8} {size / 1e6:6.2f} MB {write_time * 1e3:6.0f} ms {load_time * 1e3:6.0f} ms")
+
+if __name__ == "__main__":
+	main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,179 @@
+"""
+File: bench_guild_spread.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Benchmark for spreading per-guild scheduled runs. A stand-in client with 10k guilds
+runs an hourly-style task (a config read and a 2 ms send per guild) for one tick:
+
+	- one task looping over all guilds, as HourlyTask did before
+	- one run per guild, all at the tick (no spread)
+	- one run per guild at the tick plus GuildCronSchedule.offset() (spread)
+
+Per-guild runs go through TaskManager.submit() with the guild as key, like the
+bot's fire_schedule(), once with the default limit of 10 concurrent runs and
+once unbounded. Reports total wall time, peak concurrency and dropped runs. The
+window is 5 s instead of the example schedules' 300 s.
+
+Run from the pybot directory:
+	python tests/bench_guild_spread.py [guilds] [window]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library import config_format
+from library import config_manager
+from library.schedule_manager import GuildCronSchedule
+from library.task_manager import TaskManager
+
+SEND_TIME = 0.002
+
+
+class StandInClient:
+	"""
+	Client with plain guild objects whose home channel "sends" by sleeping.
+	"""
+
+	def __init__(self, guilds):
+		self.guilds = [SimpleNamespace(id=guild_id, get_channel=self._channel) for guild_id in range(1, guilds + 1)]
+		self.by_id = {guild.id: guild for guild in self.guilds}
+
+	def get_guild(self, guild_id):
+		return self.by_id.get(guild_id)
+
+	def _channel(self, channel_id):
+		return SimpleNamespace(id=channel_id, send=lambda text: asyncio.sleep(SEND_TIME))
+
+class Load:
+	"""
+	Tracks how many guilds are being worked on at once.
+	"""
+
+	def __init__(self):
+		self.current = 0
+		self.peak = 0
+		self.done = 0
+
+	async def guild(self, guild):
+		"""
+		The per-guild work of the hourly task.
+		"""
+		self.current += 1
+		self.peak = max(self.peak, self.current)
+		try:
+			home_channel_id = await config_manager.aget_config("home_channels", guild_id=guild.id)
+			if home_channel_id:
+				channel = guild.get_channel(int(home_channel_id))
+				await channel.send("Hourly task executed!")
+		finally:
+			self.current -= 1
+			self.done += 1
+
+class LoopTask:
+	"""
+	The hourly task before: one run walking every guild.
+	"""
+
+	def __init__(self, load):
+		self.load = load
+
+	async def run(self, client):
+		for guild in client.guilds:
+			await self.load.guild(guild)
+
+class GuildTask:
+	"""
+	The hourly task now: one run per guild.
+	"""
+
+	def __init__(self, load):
+		self.load = load
+
+	async def run(self, client, guild):
+		await self.load.guild(guild)
+
+async def tick(client, window, limit):
+	"""
+	Fire one tick of an hourly schedule and wait for its runs.
+
+	Args:
+		window (float | None): Spread window; None runs the old looping task.
+		limit (int | None): Concurrent runs of the interval; None for unbounded.
+
+	Returns:
+		tuple: (wall seconds, peak concurrency, guilds done, runs dropped)
+	"""
+	load = Load()
+	manager = TaskManager(default_limit=limit or 10 ** 9)
+	loop = asyncio.get_running_loop()
+	start = time.perf_counter()
+
+	if window is None:
+		manager.register_task("hourly", "Example Task", LoopTask(load), overlap="skip")
+		manager.submit("hourly", "Example Task", manager.get_tasks("hourly")["Example Task"], client)
+	else:
+		schedule = GuildCronSchedule("0 * * * *", spread=window)
+		task = GuildTask(load)
+		manager.register_task("hourly", "Example Task", task, overlap="skip")
+
+		fired = asyncio.Event()
+		remaining = len(client.guilds)
+
+		def fire(guild_id):
+			nonlocal remaining
+			manager.submit("hourly", "Example Task", task, client, client.get_guild(guild_id), key=guild_id)
+			remaining -= 1
+			if not remaining:
+				fired.set()
+
+		# What the scheduler's heap does for one tick: each guild at its offset.
+		for guild in client.guilds:
+			loop.call_later(schedule.offset(guild.id), fire, guild.id)
+		await fired.wait()
+
+	while manager.running.get("hourly") or manager.queues.get("hourly"):
+		await asyncio.sleep(0.01)
+	elapsed = time.perf_counter() - start
+
+	dropped = sum(stats["dropped"] for stats in manager.get_stats().values())
+	return elapsed, load.peak, load.done, dropped
+
+async def main(guilds=10000, window=5.0):
+	client = StandInClient(guilds)
+	print(f"{guilds} guilds, config read + {SEND_TIME * 1e3:.0f} ms send per guild, window {window:g} s")
+
+	for label, spread, limit in (
+		("one task looping all guilds (before)", None, 10),
+		("per guild, no spread, limit 10", 0, 10),
+		("per guild, no spread, unbounded", 0, None),
+		(f"per guild, spread {window:g} s, limit 10", window, 10),
+		(f"per guild, spread {window:g} s, unbounded", window, None),
+	):
+		elapsed, peak, done, dropped = await tick(client, spread, limit)
+		print(f"  {label:40} {elapsed:6.2f} s  peak {peak:5}  done {done:5}  dropped {dropped:5}")
+
+def use_config(directory, guilds):
+	"""
+	Install a JSON backend holding a home channel for every guild.
+	"""
+	path = os.path.join(directory, "data.json")
+	with open(path, "wb") as f:
+		f.write(config_format.dumps({"home_channels": {str(guild_id): str(guild_id) for guild_id in range(1, guilds + 1)}}))
+	config_manager.set_backend(config_manager.JsonBackend(path))
+
+if __name__ == "__main__":
+	args = sys.argv[1:]
+	guilds = int(args[0]) if args else 10000
+	with tempfile.TemporaryDirectory() as directory:
+		use_config(directory, guilds)
+		asyncio.run(main(guilds, *(float(arg) for arg in args[1:2])))
+		config_manager.set_backend(None)
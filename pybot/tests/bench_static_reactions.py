@@ -0,0 +1,81 @@
+"""
+File: bench_static_reactions.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Benchmark for reaction dispatch with 100k registered static reactions. Compares
+ResponseManager.match_static_reaction(), which looks the message up in the
+message_id index, with the list scan the raw reaction handlers did before,
+for a reaction on a registered message (hit) and on any other message (miss).
+
+Run from the pybot directory:
+	python tests/bench_static_reactions.py [reactions]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library import config_manager
+from library.response_manager import ResponseManager, StaticReaction
+
+SNOWFLAKE = 1100000000000000000
+
+
+def old_match(entries, message_id, user_id):
+	"""
+	The list scan used before the index: every entry is checked for every event.
+	"""
+	for entry in list(entries):
+		if entry["message_id"] != message_id:
+			continue
+		if entry["user_id"] not in (0, user_id):
+			continue
+		return entry
+	return None
+
+def timed(fn, rounds):
+	"""
+	Returns the mean seconds per call of fn over rounds calls.
+	"""
+	start = time.perf_counter()
+	for _ in range(rounds):
+		fn()
+	return (time.perf_counter() - start) / rounds
+
+def main(reactions=100000):
+	with tempfile.TemporaryDirectory() as directory:
+		config_manager.set_backend(config_manager.JsonBackend(os.path.join(directory, "data.json")))
+		manager = ResponseManager()
+
+		deadline = time.time() + 86400
+		old_entries = []
+		for i in range(reactions):
+			record = StaticReaction(
+				message_id=SNOWFLAKE + i, channel_id=SNOWFLAKE, user_id=0,
+				timeout_message="Timed out.", deadline=deadline, command="!autorole",
+				guild_id=SNOWFLAKE,
+			)
+			# Registered as static_reaction() does, without saving 100k config entries.
+			manager.static_reactions.setdefault(record.message_id, []).append(record)
+			manager._schedule(record)
+			old_entries.append(record.to_config())
+
+		last = SNOWFLAKE + reactions - 1
+		missing = SNOWFLAKE - 1
+
+		print(f"{reactions} registered static reactions, time per reaction event")
+		hit = timed(lambda: manager.match_static_reaction(last, 42), 200000)
+		miss = timed(lambda: manager.match_static_reaction(missing, 42), 200000)
+		print(f"  indexed lookup, hit         {hit * 1e6:10.2f} us")
+		print(f"  indexed lookup, miss        {miss * 1e6:10.2f} us")
+		scan = timed(lambda: old_match(old_entries, last, 42), 20)
+		print(f"  list scan, last entry       {scan * 1e6:10.2f} us")
+		config_manager.set_backend(None)
+
+if __name__ == "__main__":
+	main(*(int(arg) for arg in sys.argv[1:]))
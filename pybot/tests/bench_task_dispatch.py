@@ -0,0 +1,87 @@
+"""
+File: bench_task_dispatch.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Benchmark for on_message task dispatch with 100 registered tasks, each interested
+in one guild. Compares spawning every task for every message (unfiltered tasks
+that check the guild themselves, as before the dispatch index) with tasks
+registered with guilds= filters, so only matching tasks are scheduled. Messages
+come from 1000 guilds. The time per message includes running the spawned tasks.
+
+Run from the pybot directory:
+	python tests/bench_task_dispatch.py [messages]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library.task_manager import TaskManager
+
+TASKS = 100
+GUILDS = 1000
+BATCH = 100		# messages dispatched between yields to the event loop
+
+
+class GuildTask:
+	"""
+	on_message task interested in the messages of one guild.
+	"""
+
+	def __init__(self, guild_id, check):
+		self.guild_id = guild_id
+		self.check = check
+		self.handled = 0
+
+	async def run(self, client, message):
+		if self.check and message.guild.id != self.guild_id:
+			return
+		self.handled += 1
+
+def make_messages(count):
+	"""
+	Returns stand-in messages spread round-robin over GUILDS guilds.
+	"""
+	guilds = [SimpleNamespace(id=guild_id) for guild_id in range(GUILDS)]
+	return [
+		SimpleNamespace(guild=guilds[i % GUILDS], channel=SimpleNamespace(id=i % GUILDS), content="hello", attachments=[])
+		for i in range(count)
+	]
+
+async def dispatch(filtered, messages):
+	"""
+	Returns (seconds per message, runs started, messages handled) for one setup.
+	"""
+	manager = TaskManager(default_limit=10 ** 9, max_queued=10 ** 9)
+	tasks = [GuildTask(guild_id, check=not filtered) for guild_id in range(TASKS)]
+	for task in tasks:
+		guilds = {task.guild_id} if filtered else None
+		manager.register_task("on_message", f"guild-{task.guild_id}", task, guilds=guilds)
+
+	start = time.perf_counter()
+	for i, message in enumerate(messages, 1):
+		manager.run_tasks("on_message", None, message, target=message)
+		if i % BATCH == 0:
+			await asyncio.sleep(0)
+	while manager.running.get("on_message"):
+		await asyncio.sleep(0)
+	elapsed = time.perf_counter() - start
+
+	runs = sum(stats["runs"] for stats in manager.get_stats().values())
+	return elapsed / len(messages), runs, sum(task.handled for task in tasks)
+
+async def main(messages=20000):
+	print(f"{TASKS} on_message tasks, one guild each, messages from {GUILDS} guilds")
+	for label, filtered, count in (("spawn every task per message", False, messages // 10), ("filtered dispatch index", True, messages)):
+		per_message, runs, handled = await dispatch(filtered, make_messages(count))
+		print(f"  {label:30} {per_message * 1e6:9.2f} us/message  ({count} messages, {runs} runs, {handled} handled)")
+
+if __name__ == "__main__":
+	asyncio.run(main(*(int(arg) for arg in sys.argv[1:])))
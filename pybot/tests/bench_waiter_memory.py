@@ -0,0 +1,92 @@
+"""
+File: bench_waiter_memory.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Memory benchmark for ResponseManager's waiter records. Builds 1M entries as the
+per-entry dicts with ISO deadline strings used before, and as the slotted records
+used now, and reports the bytes per entry measured with tracemalloc. The figures
+include each entry's snowflake ints, its deadline and the list slot holding it.
+
+Run from the pybot directory:
+	python tests/bench_waiter_memory.py [entries]
+"""
+
+import datetime
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library.response_manager import MessageWaiter, StaticReaction
+
+SNOWFLAKE = 1100000000000000000
+
+
+def iso(deadline):
+	"""
+	Returns a deadline as the naive UTC ISO string the dicts stored.
+	"""
+	return datetime.datetime.fromtimestamp(deadline, datetime.timezone.utc).replace(tzinfo=None).isoformat()
+
+def old_message(i, deadline):
+	return {
+		"seq": i,
+		"channel_id": SNOWFLAKE + i,
+		"user_id": SNOWFLAKE + 2 * i,
+		"timeout_message": "Timed out.",
+		"timeout_datetime": iso(deadline),
+		"command": "!ticket",
+	}
+
+def old_static(i, deadline):
+	return {
+		"message_id": SNOWFLAKE + i,
+		"guild_id": SNOWFLAKE + 3 * i,
+		"channel_id": SNOWFLAKE + 2 * i,
+		"user_id": 0,
+		"timeout_message": "Timed out.",
+		"timeout_datetime": iso(deadline),
+		"command": "!autorole",
+	}
+
+def new_message(i, deadline):
+	return MessageWaiter(
+		seq=i, channel_id=SNOWFLAKE + i, user_id=SNOWFLAKE + 2 * i,
+		timeout_message="Timed out.", deadline=deadline, command="!ticket",
+	)
+
+def new_static(i, deadline):
+	return StaticReaction(
+		message_id=SNOWFLAKE + i, channel_id=SNOWFLAKE + 2 * i, user_id=0,
+		timeout_message="Timed out.", deadline=deadline, command="!autorole",
+		guild_id=SNOWFLAKE + 3 * i,
+	)
+
+def measure(make, entries):
+	"""
+	Returns the traced bytes per entry of a list of entries built by make.
+	"""
+	start = time.time() + 3600
+	gc.collect()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	records = [make(i, start + i) for i in range(entries)]
+	used = tracemalloc.get_traced_memory()[0] - before
+	tracemalloc.stop()
+	del records
+	return used / entries
+
+def main(entries=1000000):
+	print(f"{entries} entries, bytes per entry (tracemalloc)")
+	for name, old, new in (("static reaction", old_static, new_static), ("awaited message", old_message, new_message)):
+		before = measure(old, entries)
+		after = measure(new, entries)
+		print(f"  {name:16} dict + ISO string {before:6.0f} B -> slotted record {after:6.0f} B ({after / before:.0%})")
+
+if __name__ == "__main__":
+	main(*(int(arg) for arg in sys.argv[1:]))
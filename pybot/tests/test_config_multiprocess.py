@@ -0,0 +1,82 @@
+"""
+File: test_config_multiprocess.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Hammers one config store from several processes at once, for every backend,
+with write-behind enabled: appends to one shared guild list must all survive,
+and deferred writes to each process's own key must all be persisted.
+
+Run from the pybot directory:
+	python -m pytest tests
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library import config_manager
+from library.config_journal import JournalBackend
+from library.config_sharded import ShardedBackend
+from library.config_sqlite import SQLiteBackend
+
+BACKENDS = ("json", "journal", "sharded", "sqlite")
+WORKERS = 6
+APPENDS = 100
+GUILD = "1"
+
+
+def make_backend(kind, directory):
+	"""
+	Create a backend of the given kind storing its data in directory.
+	"""
+	if kind == "json":
+		return config_manager.JsonBackend(os.path.join(directory, "data.json"))
+	if kind == "journal":
+		return JournalBackend(os.path.join(directory, "data.json"), compact_at=4096)
+	if kind == "sharded":
+		return ShardedBackend(directory, max_guilds=2)
+	return SQLiteBackend(os.path.join(directory, "data.db"))
+
+def worker(kind, directory, number):
+	"""
+	One bot process: appends to the shared list and writes its own key, with write-behind on.
+	"""
+	config_manager.set_backend(make_backend(kind, directory))
+
+	async def run():
+		config_manager.enable_write_behind(debounce=0.01, max_dirty=10)
+		for i in range(APPENDS):
+			await config_manager.aappend_config("tickets", f"{number}-{i}", guild_id=GUILD)
+			await config_manager.aset_config(f"worker_{number}", i, guild_id=str(2 + i % 3))
+		await config_manager.flush()
+
+	asyncio.run(run())
+	config_manager.get_backend().close()
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_concurrent_processes_lose_no_writes(kind, tmp_path):
+	processes = [multiprocessing.Process(target=worker, args=(kind, str(tmp_path), number)) for number in range(WORKERS)]
+	for process in processes:
+		process.start()
+	for process in processes:
+		process.join(timeout=120)
+		assert process.exitcode == 0
+
+	backend = make_backend(kind, str(tmp_path))
+	try:
+		tickets = backend.read("tickets", GUILD) or []
+		assert len(tickets) == WORKERS * APPENDS
+		assert set(tickets) == {f"{number}-{i}" for number in range(WORKERS) for i in range(APPENDS)}
+
+		last = APPENDS - 1
+		for number in range(WORKERS):
+			assert backend.read(f"worker_{number}", str(2 + last % 3)) == last
+	finally:
+		backend.close()
@@ -0,0 +1,105 @@
+"""
+File: test_config_update.py
+Maintainer: Vintage Warhawk
+Last Edit: 2026-10-17
+
+Description:
+Stress test for the atomic read-modify-write helpers. Hundreds of concurrent ticket
+submissions (aappend_config) and closures (aremove_config) run against one guild
+list on every backend, and no update may be lost.
+
+Run from the pybot directory:
+	python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library import config_manager
+from library.config_journal import JournalBackend
+from library.config_sharded import ShardedBackend
+from library.config_sqlite import SQLiteBackend
+
+BACKENDS = ("json", "journal", "sharded", "sqlite")
+SUBMISSIONS = 400
+GUILD = "1"
+
+
+def make_backend(kind, directory):
+	"""
+	Create a backend of the given kind storing its data in directory.
+	"""
+	if kind == "json":
+		return config_manager.JsonBackend(os.path.join(directory, "data.json"))
+	if kind == "journal":
+		return JournalBackend(os.path.join(directory, "data.json"), compact_at=4096)
+	if kind == "sharded":
+		return ShardedBackend(directory, max_guilds=2)
+	return SQLiteBackend(os.path.join(directory, "data.db"))
+
+@pytest.fixture(params=BACKENDS)
+def kind(request, tmp_path):
+	"""
+	Install a fresh backend of each kind as the active one.
+	"""
+	config_manager.set_backend(make_backend(request.param, str(tmp_path)))
+	yield request.param
+	config_manager.set_backend(None)
+
+def ticket(number):
+	return {"user": number, "question": f"Question {number}"}
+
+def test_concurrent_submissions_lose_no_tickets(kind):
+	async def run():
+		await asyncio.gather(*(
+			config_manager.aappend_config("tickets", ticket(number), guild_id=GUILD)
+			for number in range(SUBMISSIONS)
+		))
+
+		# Close the even tickets while new ones keep coming in.
+		removals = [
+			config_manager.aremove_config("tickets", lambda item, number=number: item["user"] == number, guild_id=GUILD)
+			for number in range(0, SUBMISSIONS, 2)
+		]
+		submissions = [
+			config_manager.aappend_config("tickets", ticket(number), guild_id=GUILD)
+			for number in range(SUBMISSIONS, 2 * SUBMISSIONS)
+		]
+		return await asyncio.gather(*removals, *submissions)
+
+	results = asyncio.run(run())
+
+	removed = [item for items in results[:SUBMISSIONS // 2] for item in items]
+	assert sorted(item["user"] for item in removed) == list(range(0, SUBMISSIONS, 2))
+
+	expected = set(range(1, SUBMISSIONS, 2)) | set(range(SUBMISSIONS, 2 * SUBMISSIONS))
+	tickets = config_manager.GetConfig("tickets", guild_id=GUILD).value()
+	assert len(tickets) == len(expected)
+	assert {item["user"] for item in tickets} == expected
+
+def test_concurrent_threads_lose_no_tickets(kind, tmp_path):
+	# The sync helpers are called from scripts and executor threads as well.
+	with ThreadPoolExecutor(max_workers=8) as pool:
+		list(pool.map(lambda number: config_manager.append_config("tickets", ticket(number), guild_id=GUILD), range(SUBMISSIONS)))
+		list(pool.map(
+			lambda number: config_manager.remove_config("tickets", lambda item: item["user"] == number, guild_id=GUILD),
+			range(0, SUBMISSIONS, 2)
+		))
+
+	tickets = config_manager.GetConfig("tickets", guild_id=GUILD).value()
+	assert sorted(item["user"] for item in tickets) == list(range(1, SUBMISSIONS, 2))
+
+	# The stored list survives a reload from storage.
+	config_manager.get_backend().close()
+	reloaded = make_backend(kind, str(tmp_path))
+	try:
+		assert sorted(item["user"] for item in reloaded.read("tickets", GUILD)) == list(range(1, SUBMISSIONS, 2))
+	finally:
+		reloaded.close()